@@ -1,6 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from antenna_pattern import TabulatedPattern
+
 def gaussian_pickup_pattern(cos_theta, std_dev=0.5):
     # print("Running gaussian_pickup_pattern")
     """
@@ -15,17 +17,32 @@ def gaussian_pickup_pattern(cos_theta, std_dev=0.5):
     """
     return np.exp(-(1 - cos_theta) / (2 * std_dev**2))
 
+def pickup_pattern(cos_theta, std_dev=0.5):
+    """
+    Pickup pattern value for either a Gaussian width or a TabulatedPattern.
+    
+    Parameters:
+    cos_theta (float or ndarray): The cosine of the angle between the antenna direction and the vector to the emitter.
+    std_dev (float or TabulatedPattern): The standard deviation of the Gaussian pattern, or a measured pattern.
+    
+    Returns:
+    pickup_pattern (float or ndarray): The pickup pattern value.
+    """
+    if isinstance(std_dev, TabulatedPattern):
+        return std_dev.pickup(cos_theta)
+    return gaussian_pickup_pattern(cos_theta, std_dev)
+
 def directional_antenna(field_amplitude, emitter_position, antenna_position, antenna_direction, std_dev=0.5):
     # print("Running directional_antenna")
     """
-    Computes the signal strength received by a directional antenna with a Gaussian pickup pattern.
+    Computes the signal strength received by a directional antenna with a Gaussian or tabulated pickup pattern.
     
     Parameters:
     field_amplitude (float): The amplitude of the field at the emitter position.
     emitter_position (array-like): The (x, y, z) coordinates of the emitter.
     antenna_position (array-like): The (x, y, z) coordinates of the antenna.
     antenna_direction (array-like): The (x, y, z) direction vector the antenna is facing.
-    std_dev (float): The standard deviation of the Gaussian pattern.
+    std_dev (float or TabulatedPattern): The standard deviation of the Gaussian pattern, or a measured pattern.
     
     Returns:
     original_field_strength (float): The original field strength at the antenna position.
@@ -41,14 +58,42 @@ def directional_antenna(field_amplitude, emitter_position, antenna_position, ant
     # Calculate the angle between the antenna direction and the vector to the emitter
     cos_theta = np.dot(vector_to_emitter_normalized, antenna_direction_normalized)
     
-    # Calculate the Gaussian pickup pattern
-    pickup_pattern = gaussian_pickup_pattern(cos_theta, std_dev)
+    # Calculate the pickup pattern (Gaussian or tabulated)
+    pattern_value = pickup_pattern(cos_theta, std_dev)
     
     # Calculate the received signal strength
-    received_signal = field_amplitude * pickup_pattern
+    received_signal = field_amplitude * pattern_value
     
     return field_amplitude, received_signal
 
+def directional_antenna_matrix(field_amplitude, emitter_positions, antenna_positions, antenna_directions, std_dev=0.5):
+    """
+    Computes the signal received by many directional antennas from many emitters in one broadcast.
+    
+    Parameters:
+    field_amplitude (float or array-like): Field amplitude, broadcastable to (A, E).
+    emitter_positions (array-like): (E, 3) coordinates of the emitters.
+    antenna_positions (array-like): (A, 3) coordinates of the antennas.
+    antenna_directions (array-like): (A, 3) direction vectors the antennas are facing.
+    std_dev (float or TabulatedPattern): The standard deviation of the Gaussian pattern, or a measured pattern.
+    
+    Returns:
+    received_signal (ndarray): (A, E) signal received by each antenna from each emitter.
+    """
+    emitter_positions = np.asarray(emitter_positions, dtype=float).reshape(-1, 3)
+    antenna_positions = np.asarray(antenna_positions, dtype=float).reshape(-1, 3)
+    antenna_directions = np.asarray(antenna_directions, dtype=float).reshape(-1, 3)
+    
+    # (A, E, 3) vectors from every antenna to every emitter
+    vector_to_emitter = emitter_positions[None, :, :] - antenna_positions[:, None, :]
+    distance = np.linalg.norm(vector_to_emitter, axis=-1)
+    direction_norm = np.linalg.norm(antenna_directions, axis=-1)
+    
+    # Cosine of the angle between each antenna direction and each emitter
+    cos_theta = np.einsum('aek,ak->ae', vector_to_emitter, antenna_directions) / (distance * direction_norm[:, None])
+    
+    return field_amplitude * pickup_pattern(cos_theta, std_dev)
+
 def plot_antenna_patterns(antenna_directions, std_dev=0.5):
     # print("Running plot_antenna_patterns")
     """
@@ -56,7 +101,7 @@ def plot_antenna_patterns(antenna_directions, std_dev=0.5):
     
     Parameters:
     antenna_directions (list of array-like): A list of (x, y, z) direction vectors for the antennas.
-    std_dev (float): The standard deviation of the Gaussian pattern.
+    std_dev (float or TabulatedPattern): The standard deviation of the Gaussian pattern, or a measured pattern.
     """
     # Define angles for the 360-degree plot
     angles = np.linspace(0, 2 * np.pi, 360)
@@ -68,7 +113,7 @@ def plot_antenna_patterns(antenna_directions, std_dev=0.5):
         antenna_direction_normalized = np.array(antenna_direction) / np.linalg.norm(antenna_direction)
         
         # Calculate the pickup pattern for each angle
-        pickup_pattern = []
+        pattern_values = []
         for angle in angles:
             # Rotate the antenna direction vector by the current angle
             rotation_matrix = np.array([
@@ -79,11 +124,11 @@ def plot_antenna_patterns(antenna_directions, std_dev=0.5):
             
             # Calculate the pickup pattern for the rotated direction
             cos_theta = np.dot(rotated_direction, [1, 0])
-            pattern_value = gaussian_pickup_pattern(cos_theta, std_dev)
-            pickup_pattern.append(pattern_value)
+            pattern_value = pickup_pattern(cos_theta, std_dev)
+            pattern_values.append(pattern_value)
         
         # Plot the pickup pattern
-        plt.polar(angles, pickup_pattern, label=f'Antenna {i+1}')
+        plt.polar(angles, pattern_values, label=f'Antenna {i+1}')
     
     plt.title('Directional Antenna Pickup Patterns')
     plt.legend()
@@ -0,0 +1,98 @@
+import numpy as np
+
+
+class TabulatedPattern:
+    def __init__(self, angles, gains, db=True, normalize=True, resolution=None):
+        """
+        Antenna gain pattern sampled from a measured gain-vs-angle table.
+
+        The table is resampled once onto a uniform angle grid and the offset and slope
+        of every segment are stored, so evaluating any number of angles is one index
+        computation and one multiply-add, with no search.
+
+        Gains are interpolated in dB. A table that only covers angles >= 0 is taken as
+        symmetric about boresight and mirrored.
+
+        Parameters:
+        -----------
+        angles : array-like
+            Off-boresight angles in radians
+        gains : array-like
+            Gain at each angle, in dB if db is True, linear power gain otherwise
+        db : bool
+            Whether gains are in dB
+        normalize : bool
+            Scale the pattern to a boresight peak of 0 dB (gain 1), like gaussian_pickup_pattern
+        resolution : float, optional
+            Step of the uniform grid in radians, which includes angle 0. Defaults to the
+            smallest step of the table.
+        """
+        angles = np.asarray(angles, dtype=float).reshape(-1)
+        gains = np.asarray(gains, dtype=float).reshape(-1)
+        gains_db = gains if db else 10 * np.log10(np.maximum(gains, 1e-30))
+        order = np.argsort(angles)
+        angles, gains_db = angles[order], gains_db[order]
+        if angles[0] >= 0:
+            start = 1 if angles[0] == 0 else 0
+            angles = np.concatenate([-angles[start:][::-1], angles])
+            gains_db = np.concatenate([gains_db[start:][::-1], gains_db])
+        if resolution is None:
+            resolution = np.min(np.diff(angles)[np.diff(angles) > 0])
+        # Whole multiples of the step, so boresight (angle 0) is a grid point
+        first = int(np.floor(angles[0] / resolution))
+        grid = np.arange(first, int(np.ceil(angles[-1] / resolution)) + 1) * resolution
+        grid_db = np.interp(grid, angles, gains_db)
+        if normalize:
+            grid_db = grid_db - grid_db.max()
+
+        self.angle_min = grid[0]
+        self.angle_max = grid[-1]
+        self.step = resolution
+        self._first = first
+        self._offset = grid_db[:-1]
+        self._slope = np.diff(grid_db)
+
+    @classmethod
+    def from_csv(cls, path, delimiter=",", degrees=True, db=True, skiprows=0, **kwargs):
+        """
+        Loads a two-column (angle, gain) table from a text file.
+
+        Parameters:
+        -----------
+        path : str
+            Path of the table
+        delimiter : str
+            Column delimiter
+        degrees : bool
+            Whether the angle column is in degrees
+        db : bool
+            Whether the gain column is in dB
+        skiprows : int
+            Header lines to skip
+        """
+        table = np.loadtxt(path, delimiter=delimiter, skiprows=skiprows, ndmin=2)
+        angles = np.radians(table[:, 0]) if degrees else table[:, 0]
+        return cls(angles, table[:, 1], db=db, **kwargs)
+
+    def gain_db(self, angle):
+        """
+        Gain in dB at off-boresight angles in radians, any shape.
+        Angles are wrapped to [-pi, pi) and clamped to the table's range.
+        """
+        angle = np.mod(np.asarray(angle, dtype=float) + np.pi, 2 * np.pi) - np.pi
+        position = np.clip(angle, self.angle_min, self.angle_max) / self.step - self._first
+        index = np.minimum(position.astype(np.intp), len(self._slope) - 1)
+        return self._offset[index] + self._slope[index] * (position - index)
+
+    def gain(self, angle):
+        """Linear power gain at off-boresight angles in radians"""
+        return 10 ** (self.gain_db(angle) / 10)
+
+    __call__ = gain
+
+    def pickup(self, cos_theta):
+        """
+        Gain from the cosine of the off-boresight angle, the input of
+        antenna.gaussian_pickup_pattern. Only the angles >= 0 half of the table is used.
+        """
+        return self.gain(np.arccos(np.clip(cos_theta, -1, 1)))
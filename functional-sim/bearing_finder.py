@@ -1,8 +1,14 @@
+from functools import lru_cache
+
 import numpy as np
 
+from antenna_pattern import TabulatedPattern
+
+_A = -np.log(0.5)
+
 def calculate_A():
     """Calculate the constant A = -ln(0.5) for half-power beamwidth"""
-    return -np.log(0.5)
+    return _A
 
 def power_output(phi, psi_0, G0, squint_angle=0):
     """
@@ -12,8 +18,8 @@ def power_output(phi, psi_0, G0, squint_angle=0):
     -----------
     phi : float or numpy.ndarray
         Bearing angle in radians
-    psi_0 : float
-        Half of the half-power beamwidth in radians
+    psi_0 : float or TabulatedPattern
+        Half of the half-power beamwidth in radians, or a measured pattern
     G0 : float
         Antenna boresight gain
     squint_angle : float, optional
@@ -24,6 +30,8 @@ def power_output(phi, psi_0, G0, squint_angle=0):
     float or numpy.ndarray
         Power output
     """
+    if isinstance(psi_0, TabulatedPattern):
+        return G0 * psi_0.gain(phi - squint_angle)
     A = calculate_A()
     return G0 * np.exp(-A * ((phi - squint_angle) / psi_0)**2)
 
@@ -60,14 +68,16 @@ def bearing_from_power_db(P1_db, P2_db, Phi, psi_0):
         Power measurement from second antenna in dB
     Phi : float
         Squint angle in radians
-    psi_0 : float
-        Half of the half-power beamwidth in radians
+    psi_0 : float or TabulatedPattern
+        Half of the half-power beamwidth in radians, or a measured pattern
 
     Returns:
     --------
     float or numpy.ndarray
         Bearing angle in radians
     """
+    if isinstance(psi_0, TabulatedPattern):
+        return inverse_bearing_table(Phi, psi_0).from_db(P1_db, P2_db)
     return (  ((psi_0**2) / ((2 * 6.0202) * Phi) * (P2_db - P1_db)) ) + Phi/2
 
 def bearing_from_power_natural(P1, P2, Phi, psi_0):
@@ -82,17 +92,80 @@ def bearing_from_power_natural(P1, P2, Phi, psi_0):
         Power measurement from second antenna
     Phi : float
         Squint angle in radians
-    psi_0 : float
-        Half of the half-power beamwidth in radians
+    psi_0 : float or TabulatedPattern
+        Half of the half-power beamwidth in radians, or a measured pattern
 
     Returns:
     --------
     float or numpy.ndarray
         Bearing angle in radians
     """
+    if isinstance(psi_0, TabulatedPattern):
+        return inverse_bearing_table(Phi, psi_0).from_natural(P1, P2)
     A = calculate_A()
     return ((( (psi_0**2)/ ((2*A) * Phi)) * (np.log(P2) - np.log(P1))) + Phi/2)
 
+# Natural-log units per dB, so dB ratios index the same tables
+DB_TO_NEPER = np.log(10) / 10
+
+class InverseBearingTable:
+    def __init__(self, Phi, psi_0, n_samples=4096):
+        """
+        Precomputed inverse of the two-beam power ratio: ln(P2/P1) -> bearing.
+
+        Bearings around Phi/2 are sampled once, the log power ratio of the beams at 0
+        and Phi is computed for each, and the range where it rises strictly is kept.
+        Every later inversion is one binary search and linear interpolation over whole
+        arrays, for Gaussian and measured patterns alike.
+
+        Parameters:
+        -----------
+        Phi : float
+            Squint angle in radians, must be positive
+        psi_0 : float or TabulatedPattern
+            Half of the half-power beamwidth in radians, or a measured pattern
+        n_samples : int
+            Bearings sampled over [Phi/2 - pi, Phi/2 + pi]
+        """
+        if not Phi > 0:
+            raise ValueError(f"Squint angle Phi must be positive, got {Phi}")
+        phi = np.linspace(Phi / 2 - np.pi, Phi / 2 + np.pi, n_samples)
+        if isinstance(psi_0, TabulatedPattern):
+            log_ratio = (psi_0.gain_db(phi - Phi) - psi_0.gain_db(phi)) * DB_TO_NEPER
+        else:
+            log_ratio = -calculate_A() * (((phi - Phi) / psi_0)**2 - (phi / psi_0)**2)
+
+        falling = np.flatnonzero(np.diff(log_ratio) <= 0)
+        centre = n_samples // 2
+        start = falling[falling < centre].max() + 1 if (falling < centre).any() else 0
+        stop = falling[falling >= centre].min() + 1 if (falling >= centre).any() else n_samples
+        if stop - start < 2:
+            raise ValueError("Power ratio does not rise around Phi/2, the pattern cannot be inverted")
+        self.Phi = Phi
+        self.log_ratio = log_ratio[start:stop]
+        self.bearing = phi[start:stop]
+
+    def __call__(self, log_ratio):
+        """Bearing in radians from ln(P2/P1); ratios outside the table are clamped to its ends"""
+        return np.interp(log_ratio, self.log_ratio, self.bearing)
+
+    def from_natural(self, P1, P2):
+        """Bearing in radians from powers in natural units"""
+        return self(np.log(np.divide(P2, P1)))
+
+    def from_db(self, P1_db, P2_db):
+        """Bearing in radians from powers in dB"""
+        return self(np.subtract(P2_db, P1_db) * DB_TO_NEPER)
+
+@lru_cache(maxsize=32)
+def inverse_bearing_table(Phi, psi_0, n_samples=4096):
+    """
+    InverseBearingTable for a squint angle and pattern, built once per distinct
+    (Phi, psi_0, n_samples) and reused afterwards. Patterns are keyed by identity.
+    Invalid squints raise ValueError and are not cached.
+    """
+    return InverseBearingTable(Phi, psi_0, n_samples)
+
 # Example usage
 def example_usage():
     # Example parameters
@@ -0,0 +1,265 @@
+import numpy as np
+
+
+def bearing_lines(origins, angles):
+    """
+    Line coefficients of bearings, so that a . u = b for every point u on the line.
+
+    This is the same row as localize-shittyVersion.estimate_emitter_location builds:
+    a = (sin(theta), -cos(theta)), b = sin(theta) * x - cos(theta) * y.
+
+    Parameters:
+    origins (array-like): (N, 2) bearing origins.
+    angles (array-like): (N,) bearing angles in radians.
+
+    Returns:
+    A (ndarray): (N, 2) line normals.
+    b (ndarray): (N,) right-hand sides.
+    """
+    origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+    angles = np.asarray(angles, dtype=float).reshape(-1)
+    sin_theta = np.sin(angles)
+    cos_theta = np.cos(angles)
+    A = np.stack([sin_theta, -cos_theta], axis=1)
+    b = sin_theta * origins[:, 0] - cos_theta * origins[:, 1]
+    return A, b
+
+def fuse_bearings(origins, angles, weights=None):
+    """
+    Weighted least-squares fusion of bearings into one position estimate.
+
+    Rows are scaled by the weights instead of multiplying by a dense diagonal
+    weight matrix, so memory and time stay linear in the number of bearings.
+
+    Parameters:
+    origins (array-like): (N, 2) bearing origins.
+    angles (array-like): (N,) bearing angles in radians.
+    weights (array-like, optional): (N,) per-bearing confidences, e.g. the confidence
+        from SwitchedArrayRDF.estimate_direction or a signal strength. Each bearing
+        line's squared residual is weighted by its confidence.
+
+    Returns:
+    position (ndarray): (x, y) estimate.
+    covariance (ndarray): 2x2 covariance, sigma^2 (A^T W A)^-1 with sigma^2 from the residuals.
+    gdop (float): Geometric dilution of precision, sqrt(trace((A^T W A)^-1)) with weights
+        normalised to a mean of 1.
+    """
+    A, b = bearing_lines(origins, angles)
+    n = len(b)
+    weights = np.ones(n) if weights is None else np.asarray(weights, dtype=float).reshape(-1)
+    weights = weights / weights.mean()
+
+    # Scale rows by sqrt(w) so the normal equations are A^T W A u = A^T W b
+    sqrt_w = np.sqrt(weights)
+    A_weighted = A * sqrt_w[:, None]
+    b_weighted = b * sqrt_w
+    position, residuals, rank, _ = np.linalg.lstsq(A_weighted, b_weighted, rcond=None)
+    if rank < 2:
+        return np.full(2, np.nan), np.full((2, 2), np.nan), np.inf
+
+    inverse = np.linalg.inv(A_weighted.T @ A_weighted)
+    rss = residuals[0] if len(residuals) else 0.0
+    sigma_squared = rss / max(n - 2, 1)
+    gdop = float(np.sqrt(np.trace(inverse)))
+    return position, sigma_squared * inverse, gdop
+
+
+class RecursiveBearingLocalizer:
+    def __init__(self, forgetting=1.0):
+        """
+        Streaming least-squares emitter localization from bearings.
+
+        Each bearing is folded into running 2x2 normal equations (A^T W A, A^T W b),
+        so an update is O(1) no matter how many bearings came before.
+
+        Parameters:
+        -----------
+        forgetting : float
+            Factor (0 < forgetting <= 1) applied to the past on every bearing.
+            1.0 weighs all bearings equally (static emitter); lower values let the
+            estimate follow a moving emitter, with an effective memory of about
+            1 / (1 - forgetting) bearings.
+        """
+        self.forgetting = forgetting
+        self.reset()
+
+    def reset(self):
+        """Forget all bearings"""
+        self.normal = np.zeros((2, 2))
+        self.rhs = np.zeros(2)
+        self.b_squared = 0.0
+        self.n_bearings = 0
+
+    def update(self, origin, angle, weight=1.0):
+        """
+        Folds one bearing into the normal equations and returns the new estimate.
+
+        Parameters:
+        -----------
+        origin : array-like
+            (x, y) origin of the bearing
+        angle : float
+            Bearing angle in radians
+        weight : float
+            Confidence of the bearing
+
+        Returns:
+        --------
+        numpy.ndarray
+            Position estimate (x, y), NaN until two non-parallel bearings are seen
+        numpy.ndarray
+            2x2 covariance of the estimate
+        """
+        sin_theta = np.sin(angle)
+        cos_theta = np.cos(angle)
+        a = np.array([sin_theta, -cos_theta])
+        b = sin_theta * origin[0] - cos_theta * origin[1]
+
+        lam = self.forgetting
+        self.normal = lam * self.normal + weight * np.outer(a, a)
+        self.rhs = lam * self.rhs + weight * b * a
+        self.b_squared = lam * self.b_squared + weight * b * b
+        self.n_bearings += 1
+        return self.estimate()
+
+    def update_many(self, origins, angles, weights=None):
+        """
+        Folds a batch of bearings in one vectorized step, equivalent to calling
+        update on each of them in order.
+
+        Returns:
+        --------
+        numpy.ndarray
+            Position estimate (x, y)
+        numpy.ndarray
+            2x2 covariance of the estimate
+        """
+        A, b = bearing_lines(origins, angles)
+        n = len(b)
+        weights = np.ones(n) if weights is None else np.asarray(weights, dtype=float)
+        # Older bearings in the batch have been forgotten more times
+        decay = self.forgetting ** np.arange(n - 1, -1, -1)
+        w = weights * decay
+
+        total_decay = self.forgetting ** n
+        self.normal = total_decay * self.normal + (A * w[:, None]).T @ A
+        self.rhs = total_decay * self.rhs + A.T @ (w * b)
+        self.b_squared = total_decay * self.b_squared + np.dot(w, b * b)
+        self.n_bearings += n
+        return self.estimate()
+
+    def estimate(self):
+        """
+        Current position estimate and its covariance.
+
+        The covariance is sigma^2 (A^T W A)^-1, with sigma^2 estimated from the
+        weighted residual of the bearing lines at the estimate.
+        """
+        if self.n_bearings < 2 or abs(np.linalg.det(self.normal)) < 1e-12:
+            return np.full(2, np.nan), np.full((2, 2), np.nan)
+        inverse = np.linalg.inv(self.normal)
+        position = inverse @ self.rhs
+        # Residual sum of squares from the running sums: b^T W b - u^T A^T W b
+        rss = max(self.b_squared - position @ self.rhs, 0.0)
+        sigma_squared = rss / max(self.n_bearings - 2, 1)
+        return position, sigma_squared * inverse
+
+
+def bearing_log_likelihood(points, origins, angles, sigma=0.05, weights=None, line_bearings=False):
+    """
+    Log-likelihood of candidate emitter positions given all bearings.
+
+    Each bearing error r is the wrapped angle between the measured bearing and the
+    direction from the bearing origin to the candidate, scored with a von Mises
+    likelihood kappa * cos(r), kappa = 1 / sigma^2. That is the wrapped form of a
+    Gaussian r^2 / (2 sigma^2) penalty and needs no atan2: cos(r) and sin(r) come
+    from dot and cross products, which for the whole (candidates x bearings) matrix
+    are three small matrix products.
+
+    Parameters:
+    points (ndarray): (G, 2) candidate positions.
+    origins (ndarray): (N, 2) bearing origins.
+    angles (ndarray): (N,) measured bearing angles in radians.
+    sigma (float): Bearing noise standard deviation in radians.
+    weights (ndarray, optional): (N,) per-bearing weights.
+    line_bearings (bool): Treat bearings as lines (ambiguous by pi) instead of rays,
+        scoring cos(2r) / 4 so both directions of a line match.
+
+    Returns:
+    log_likelihood (ndarray): (G,) log-likelihood of each candidate, up to a constant.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+    angles = np.asarray(angles, dtype=float).reshape(-1)
+    weights = np.ones(len(angles)) if weights is None else np.asarray(weights, dtype=float)
+    kappa = 1 / sigma**2
+
+    ux, uy = np.cos(angles), np.sin(angles)
+    ox, oy = origins[:, 0], origins[:, 1]
+    # Rows multiply [px, py, 1] and [px, py, |p|^2, 1] of every candidate
+    dot_coeffs = np.stack([ux, uy, -(ux * ox + uy * oy)])
+    cross_coeffs = np.stack([-uy, ux, uy * ox - ux * oy])
+    range_coeffs = np.stack([-2 * ox, -2 * oy, np.ones_like(ox), ox**2 + oy**2])
+
+    log_likelihood = np.empty(len(points))
+    # (candidates x bearings) matrices, in blocks of candidates to bound memory
+    block = max(1, 2**22 // max(len(angles), 1))
+    for start in range(0, len(points), block):
+        p = points[start:start + block]
+        ones = np.ones((len(p), 1))
+        p_affine = np.hstack([p, ones])
+        dot = p_affine @ dot_coeffs
+        range_squared = np.maximum(np.hstack([p, (p**2).sum(axis=1, keepdims=True), ones]) @ range_coeffs, 1e-12)
+        if line_bearings:
+            cross = p_affine @ cross_coeffs
+            cos_r = (dot**2 - cross**2) / range_squared  # cos(2r)
+            log_likelihood[start:start + block] = (kappa / 4) * (cos_r @ weights)
+        else:
+            cos_r = dot / np.sqrt(range_squared)
+            log_likelihood[start:start + block] = kappa * (cos_r @ weights)
+    return log_likelihood - kappa * weights.sum() * (0.25 if line_bearings else 1)
+
+def ml_grid_localize(origins, angles, bounds=(0, 500, 0, 500), sigma=0.05, weights=None, grid_size=48,
+                     refine_size=16, levels=4, line_bearings=False):
+    """
+    Coarse-to-fine maximum-likelihood localization.
+
+    The full area is scored on a grid_size x grid_size grid. Each refinement level
+    then scores a small refine_size x refine_size grid spanning two cells of the
+    previous level around its best cell, so the final resolution is reached without
+    ever scoring a full fine grid.
+
+    Parameters:
+    origins (ndarray): (N, 2) bearing origins.
+    angles (ndarray): (N,) bearing angles in radians.
+    bounds (tuple): (x_min, x_max, y_min, y_max) of the search area.
+    sigma (float): Bearing noise standard deviation in radians.
+    weights (ndarray, optional): (N,) per-bearing weights.
+    grid_size (int): Grid points per axis of the coarse grid.
+    refine_size (int): Grid points per axis of every refinement grid.
+    levels (int): Number of refinement levels after the coarse grid.
+    line_bearings (bool): Treat bearings as lines (ambiguous by pi) instead of rays.
+
+    Returns:
+    position (ndarray): (x, y) maximum-likelihood estimate.
+    surface (ndarray): (grid_size, grid_size) coarse log-likelihood surface, indexed [x, y].
+    axes (tuple): (x, y) coordinates of the coarse surface.
+    """
+    x_min, x_max, y_min, y_max = bounds
+    xs = np.linspace(x_min, x_max, grid_size)
+    ys = np.linspace(y_min, y_max, grid_size)
+    surface = axes = None
+
+    for level in range(levels + 1):
+        X, Y = np.meshgrid(xs, ys, indexing="ij")
+        scores = bearing_log_likelihood(np.stack([X.ravel(), Y.ravel()], axis=1), origins, angles,
+                                        sigma, weights, line_bearings).reshape(len(xs), len(ys))
+        if level == 0:
+            surface, axes = scores, (xs, ys)
+        best = np.unravel_index(np.argmax(scores), scores.shape)
+        centre = np.array([xs[best[0]], ys[best[1]]])
+        step_x, step_y = xs[1] - xs[0], ys[1] - ys[0]
+        xs = np.linspace(centre[0] - 2 * step_x, centre[0] + 2 * step_x, refine_size)
+        ys = np.linspace(centre[1] - 2 * step_y, centre[1] + 2 * step_y, refine_size)
+
+    return centre, surface, axes
@@ -0,0 +1,175 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _box_sum(values, half_t, half_f):
+    """
+    Sum of values over a (2*half_t+1) x (2*half_f+1) window centred on every cell.
+
+    Along time the window rows are added directly, so nothing accumulates over the
+    length of the capture and long captures do not lose precision. Along frequency
+    each sweep uses its own running sum, so the cost does not depend on half_f.
+    """
+    n_t, n_f = values.shape
+    padded = np.pad(values, ((half_t, half_t), (0, 0)))
+    rows = padded[:n_t].copy()
+    for shift in range(1, 2 * half_t + 1):
+        rows += padded[shift:shift + n_t]
+
+    table = np.zeros((n_t, n_f + 1))
+    np.cumsum(rows, axis=1, out=table[:, 1:])
+    f = np.arange(n_f)
+    f0 = np.clip(f - half_f, 0, n_f)
+    f1 = np.clip(f + half_f + 1, 0, n_f)
+    return table[:, f1] - table[:, f0]
+
+def ca_cfar(power_db, guard=(0, 3), train=(0, 8), threshold_db=10.0):
+    """
+    Cell-averaging CFAR over a (time x frequency) power matrix.
+
+    The noise level of each cell is the mean linear power of the training ring
+    around it (a (guard+train) box minus the guard box). Missing (NaN) cells are
+    left out of the training average and are never detected.
+
+    By default only neighbouring frequency bins of the same sweep are trained on.
+    Training along time (train[0] > 0) averages the same bins of earlier and later
+    sweeps, so an emitter that lasts longer than guard[0] sweeps, such as a jammer,
+    trains on itself and is masked; use it only for short bursts. The frequency guard
+    should cover half the emitter bandwidth for the same reason: a barrage jammer
+    spanning ~70 bins needs about guard=(0, 40), train=(0, 30).
+
+    Parameters:
+    -----------
+    power_db : numpy.ndarray
+        (time x frequency) power in dBm, e.g. WaterfallBuilder.power
+    guard : tuple of int
+        Guard cells on each side along (time, frequency)
+    train : tuple of int
+        Training cells beyond the guard cells along (time, frequency), no time
+        training by default
+    threshold_db : float
+        Detection threshold above the local noise level
+
+    Returns:
+    --------
+    numpy.ndarray
+        Boolean detection mask
+    numpy.ndarray
+        SNR of every cell over its local noise level in dB
+    """
+    power_db = np.asarray(power_db, dtype=np.float64)
+    valid = ~np.isnan(power_db)
+    linear = np.where(valid, 10 ** (power_db / 10), 0.0)
+    ones = valid.astype(np.float64)
+
+    outer = (guard[0] + train[0], guard[1] + train[1])
+    noise_sum = _box_sum(linear, *outer) - _box_sum(linear, *guard)
+    noise_count = _box_sum(ones, *outer) - _box_sum(ones, *guard)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        noise_db = 10 * np.log10(noise_sum / noise_count)
+    snr_db = power_db - noise_db
+    detections = valid & (noise_count > 0) & (snr_db > threshold_db)
+    return detections, snr_db
+
+def os_cfar(power_db, guard=1, train=8, rank=0.75, threshold_db=10.0):
+    """
+    Order-statistic CFAR along the frequency axis of every sweep.
+
+    The noise level of each cell is the rank-quantile of the training cells on both
+    sides of it, which keeps a strong neighbouring emitter from masking a weaker one.
+
+    Parameters:
+    -----------
+    power_db : numpy.ndarray
+        (time x frequency) power in dBm
+    guard : int
+        Guard cells on each side along frequency
+    train : int
+        Training cells on each side beyond the guard cells
+    rank : float
+        Quantile (0-1) of the training cells used as the noise level
+    threshold_db : float
+        Detection threshold above the local noise level
+
+    Returns:
+    --------
+    numpy.ndarray
+        Boolean detection mask
+    numpy.ndarray
+        SNR of every cell over its local noise level in dB
+    """
+    power_db = np.asarray(power_db, dtype=np.float64)
+    half = guard + train
+    # Mirror the band edges so edge cells still have a full training set
+    padded = np.pad(power_db, ((0, 0), (half, half)), mode="reflect")
+    windows = sliding_window_view(padded, 2 * half + 1, axis=1)
+    training = np.concatenate([windows[..., :train], windows[..., -train:]], axis=-1)
+
+    # Ordering in dB is the same as in linear power. Missing (NaN) training cells
+    # sort last as +inf and the rank is taken among each cell's valid training cells,
+    # so a missing segment only affects the cells whose windows overlap it
+    n_valid = (~np.isnan(training)).sum(axis=-1)
+    ordered = np.sort(np.where(np.isnan(training), np.inf, training), axis=-1)
+    k = np.rint(rank * np.maximum(n_valid - 1, 0)).astype(np.intp)
+    noise_db = np.take_along_axis(ordered, k[..., None], axis=-1)[..., 0]
+    noise_db[n_valid == 0] = np.nan
+    snr_db = power_db - noise_db
+    detections = ~np.isnan(snr_db) & (snr_db > threshold_db)
+    return detections, snr_db
+
+def extract_detections(detections, snr_db, power_db, timestamps=None, frequencies=None):
+    """
+    Turns a detection mask into arrays of time, frequency, power and SNR.
+
+    Returns:
+    --------
+    dict
+        "time_index", "freq_index", "timestamp", "frequency" (Hz),
+        "power" (dBm) and "snr" (dB), one entry per detected cell
+    """
+    t_idx, f_idx = np.nonzero(detections)
+    return {
+        "time_index": t_idx,
+        "freq_index": f_idx,
+        "timestamp": None if timestamps is None else np.asarray(timestamps)[t_idx],
+        "frequency": None if frequencies is None else np.asarray(frequencies)[f_idx],
+        "power": np.asarray(power_db)[t_idx, f_idx],
+        "snr": snr_db[t_idx, f_idx],
+    }
+
+def detections_to_emitters(detections, positions=None):
+    """
+    Groups detections in adjacent frequency bins into emitters, in the list-of-dicts
+    form used by rf_simulation.
+
+    Parameters:
+    -----------
+    detections : dict
+        Output of extract_detections (with frequencies)
+    positions : list, optional
+        One (x, y, z) position per emitter, e.g. from a localizer. Left as None otherwise.
+
+    Returns:
+    --------
+    list
+        Emitters with "position", "power" (peak linear power, mW), "frequency" (Hz,
+        at the peak) and "snr" (peak SNR in dB)
+    """
+    f_idx = detections["freq_index"]
+    if not len(f_idx):
+        return []
+    bins = np.unique(f_idx)
+    groups = np.split(bins, np.nonzero(np.diff(bins) > 1)[0] + 1)
+
+    emitters = []
+    for i, group in enumerate(groups):
+        members = np.nonzero(np.isin(f_idx, group))[0]
+        peak = members[np.argmax(detections["power"][members])]
+        emitters.append({
+            "position": None if positions is None else positions[i],
+            "power": float(10 ** (detections["power"][peak] / 10)),
+            "frequency": None if detections["frequency"] is None else detections["frequency"][peak],
+            "snr": float(detections["snr"][peak]),
+        })
+    return emitters
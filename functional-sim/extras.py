@@ -1,13 +1,16 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+import bearing_finder as bf
+from antenna_pattern import TabulatedPattern
+
 
 # Plot the RF field strength in 3D
 def plot_rf_field_strength(field, environment, xlabel='X', ylabel='Y', zlabel='Z', title='3D RF Field Strength'):
     fig = plt.figure()
     ax = fig.add_subplot(111, projection='3d')
 
-    x, y, z = environment
+    x, y, z = np.broadcast_arrays(*environment)
     sc = ax.scatter(x, y, z, c=field, cmap='viridis')
 
     plt.colorbar(sc, label='Field Strength')
@@ -21,10 +24,10 @@ def plot_rf_field_strength(field, environment, xlabel='X', ylabel='Y', zlabel='Z
 # Get Field strength at a given position
 def get_field_strength_at_position(field, space_dim, resolution, position):
     """
-    Gets the field strength at a specific position in the 3D space.
+    Gets the field strength at a specific position in the 3D space, interpolated trilinearly.
     
     Parameters:
-    field (ndarray): The RF field strength at each point in the 3D space.
+    field (ndarray): The RF field strength at each point in the 3D space (from a dense or open grid).
     space_dim (int): The dimension of the 3D space.
     resolution (int): The resolution of the 3D space.
     position (array-like): The (x, y, z) coordinates of the position.
@@ -32,17 +35,60 @@ def get_field_strength_at_position(field, space_dim, resolution, position):
     Returns:
     field_strength (float): The field strength at the specified position.
     """
-    x, y, z = position
-    x_index = int(x / space_dim * (resolution - 1))
-    y_index = int(y / space_dim * (resolution - 1))
-    z_index = int(z / space_dim * (resolution - 1))
+    return sample_field(field, space_dim, resolution, position)[0]
+
+def sample_field(field, space_dim, resolution, positions, fill_value=None):
+    """
+    Trilinearly interpolates the field at many positions at once.
+    
+    The field is indexed [y, x, z], the default 'xy' ordering of the meshgrid in
+    rf_simulation.setup_3d_space, while positions are (x, y, z).
+    
+    Parameters:
+    field (ndarray): The RF field strength on the (resolution, resolution, resolution) grid.
+    space_dim (int): The dimension of the 3D space.
+    resolution (int): The resolution of the 3D space.
+    positions (array-like): (N, 3) coordinates of the positions.
+    fill_value (float, optional): Value for positions outside the space. By default they
+        are clamped to its boundary.
     
-    return field[x_index, y_index, z_index]
+    Returns:
+    field_strength (ndarray): (N,) field strength at each position.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    field = np.broadcast_to(field, (resolution,) * 3)
+    grid = positions / space_dim * (resolution - 1)
+    outside = np.any((grid < 0) | (grid > resolution - 1), axis=1)
+    grid = np.clip(grid, 0, resolution - 1)
+    
+    # Lower corner of each cell and the fractional position inside it
+    lower = np.minimum(grid.astype(np.intp), resolution - 2)
+    frac = grid - lower
+    x0, y0, z0 = lower.T
+    fx, fy, fz = frac.T
+    
+    values = np.zeros(len(positions))
+    for dx in (0, 1):
+        wx = fx if dx else 1 - fx
+        for dy in (0, 1):
+            wy = fy if dy else 1 - fy
+            for dz in (0, 1):
+                wz = fz if dz else 1 - fz
+                values += wx * wy * wz * field[y0 + dy, x0 + dx, z0 + dz]
+    
+    if fill_value is not None:
+        values[outside] = fill_value
+    return values
 
 
 def calculate_target_angle(pow1, pow2, psi_0=0.5061454830783556, phi=np.pi/4):
-    A_const = (-1 * np.log(0.5))
-    angTarget = ((psi_0**2/(2*A_const*phi)) * (np.log(pow2)-np.log(pow1)))
+    """
+    Angle of the target from the centre of an antenna pair, from the two received powers.
+    psi_0 may be a TabulatedPattern, inverted through a cached bearing_finder.InverseBearingTable.
+    """
+    if isinstance(psi_0, TabulatedPattern):
+        return bf.inverse_bearing_table(phi, psi_0).from_natural(pow1, pow2) - phi / 2
+    angTarget = ((psi_0**2/(2*bf.calculate_A()*phi)) * (np.log(pow2)-np.log(pow1)))
     return angTarget
 
 
@@ -0,0 +1,111 @@
+from collections import OrderedDict
+
+import numpy as np
+import rf_simulation as rfSim
+
+
+def make_emitter_key(emitters):
+    """
+    Builds a hashable key from a list of emitters.
+
+    Parameters:
+    emitters (list): List of emitters with their positions and powers.
+
+    Returns:
+    key (tuple): Tuple of ((x, y, z), power) entries, one per emitter.
+    """
+    return tuple(
+        (tuple(float(c) for c in np.ravel(emitter["position"])), float(emitter["power"]))
+        for emitter in emitters
+    )
+
+
+class FieldCache:
+    def __init__(self, maxsize=8, max_bytes=2**30):
+        """
+        LRU cache of 3D environments and their RF fields.
+
+        A field has resolution^3 float64 values, so one entry at resolution 500 is
+        already 1 GB. Entries are evicted when either limit is exceeded; the most
+        recent entry is always kept, even when it alone is larger than max_bytes.
+
+        Parameters:
+        -----------
+        maxsize : int
+            Maximum number of (environment, field) entries kept before the
+            least recently used one is evicted
+        max_bytes : int or None
+            Maximum total size of the cached arrays in bytes, None for no limit
+        """
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, space_dim, resolution, emitters):
+        """
+        Returns the environment and field for a scene, building it on a miss.
+
+        The returned arrays are shared between callers and are marked read-only;
+        copy them before modifying them in place.
+
+        Parameters:
+        -----------
+        space_dim : float
+            The dimension of the 3D space
+        resolution : int
+            The resolution of the 3D space
+        emitters : list
+            List of emitters with their positions and powers
+
+        Returns:
+        --------
+        tuple
+            Environment (X, Y, Z) as an open grid from setup_3d_space(sparse=True)
+        numpy.ndarray
+            RF field strength at each point in the 3D space
+        """
+        key = (float(space_dim), int(resolution), make_emitter_key(emitters))
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        # Open grid: coordinates cost O(resolution) instead of O(resolution^3)
+        environment = rfSim.setup_3d_space(space_dim, resolution, sparse=True)
+        field = rfSim.compute_rf_field_strength(emitters, environment[0], environment[1], environment[2])
+        # Shared by every later hit, so an in-place edit by one caller must not corrupt the others
+        for array in (*environment, field):
+            array.flags.writeable = False
+        self._entries[key] = (environment, field)
+        self.nbytes += field.nbytes + sum(axis.nbytes for axis in environment)
+        while len(self._entries) > 1 and (len(self._entries) > self.maxsize
+                                          or (self.max_bytes is not None and self.nbytes > self.max_bytes)):
+            self._evict_oldest()
+        return environment, field
+
+    def _evict_oldest(self):
+        old_environment, old_field = self._entries.popitem(last=False)[1]
+        self.nbytes -= old_field.nbytes + sum(axis.nbytes for axis in old_environment)
+
+    def clear(self):
+        """Drop all cached entries and reset the hit/miss counters"""
+        self._entries.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """Return a dict with the current hits, misses and size of the cache"""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "maxsize": self.maxsize,
+                "nbytes": self.nbytes, "max_bytes": self.max_bytes}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared cache used by targetVector.setup_environment
+default_cache = FieldCache()
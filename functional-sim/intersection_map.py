@@ -0,0 +1,122 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _intersect(origins_i, directions_i, origins_j, directions_j, forward_only):
+    """
+    Intersection points of line pairs (i, j), broadcasting over the inputs.
+    Returns the points and a mask of pairs that are not (near) parallel.
+    """
+    denom = directions_i[..., 0] * directions_j[..., 1] - directions_i[..., 1] * directions_j[..., 0]
+    delta = origins_j - origins_i
+    valid = np.abs(denom) > 1e-9
+    safe = np.where(valid, denom, 1.0)
+    t = (delta[..., 0] * directions_j[..., 1] - delta[..., 1] * directions_j[..., 0]) / safe
+    points = origins_i + t[..., None] * directions_i
+    if forward_only:
+        s = (delta[..., 0] * directions_i[..., 1] - delta[..., 1] * directions_i[..., 0]) / safe
+        valid &= (t > 0) & (s > 0)
+    return points, valid
+
+def iter_pairwise_intersections(origins, directions, chunk_size=1024, forward_only=False):
+    """
+    Yields the intersections of all bearing-line pairs (i < j) in blocks of
+    chunk_size x chunk_size pairs, so memory is bounded however many bearings there are.
+
+    Parameters:
+    origins (ndarray): (N, 2) bearing origins, e.g. from visualiseTarget.target_to_origin_direction.
+    directions (ndarray): (N, 2) bearing direction vectors.
+    chunk_size (int): Bearings per block side.
+    forward_only (bool): Keep only intersections in front of both bearings (rays, not lines).
+
+    Yields:
+    points (ndarray): (M, 2) intersection points of one block.
+    """
+    origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+    directions = np.asarray(directions, dtype=float).reshape(-1, 2)
+    n = len(origins)
+    for i0 in range(0, n, chunk_size):
+        i1 = min(i0 + chunk_size, n)
+        for j0 in range(i0, n, chunk_size):
+            j1 = min(j0 + chunk_size, n)
+            points, valid = _intersect(origins[i0:i1, None], directions[i0:i1, None],
+                                       origins[None, j0:j1], directions[None, j0:j1], forward_only)
+            # Each unordered pair once
+            valid &= np.arange(i0, i1)[:, None] < np.arange(j0, j1)[None, :]
+            yield points[valid]
+
+def iter_sampled_intersections(origins, directions, n_pairs, chunk_size=2**20, forward_only=False, seed=None):
+    """
+    Same as iter_pairwise_intersections but for n_pairs randomly drawn pairs,
+    for bearing counts where all pairs would be too many.
+    """
+    rng = np.random.default_rng(seed)
+    origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+    directions = np.asarray(directions, dtype=float).reshape(-1, 2)
+    n = len(origins)
+    for start in range(0, n_pairs, chunk_size):
+        size = min(chunk_size, n_pairs - start)
+        i = rng.integers(0, n, size)
+        j = (i + rng.integers(1, n, size)) % n
+        points, valid = _intersect(origins[i], directions[i], origins[j], directions[j], forward_only)
+        yield points[valid]
+
+def intersection_density(origins, directions, space_dim=500, bins=250, max_pairs=10**7, chunk_size=1024,
+                         forward_only=False, seed=None):
+    """
+    2-D histogram of bearing-line intersections over the [0, space_dim]^2 area.
+
+    All pairs are used while N(N-1)/2 <= max_pairs, otherwise max_pairs random pairs.
+
+    Returns:
+    density (ndarray): (bins, bins) intersection counts, indexed [x_bin, y_bin].
+    edges (ndarray): (bins + 1,) bin edges shared by both axes.
+    """
+    n = len(origins)
+    if n * (n - 1) // 2 <= max_pairs:
+        blocks = iter_pairwise_intersections(origins, directions, chunk_size, forward_only)
+    else:
+        blocks = iter_sampled_intersections(origins, directions, max_pairs, forward_only=forward_only, seed=seed)
+
+    edges = np.linspace(0, space_dim, bins + 1)
+    counts = np.zeros(bins * bins, dtype=np.int64)
+    for points in blocks:
+        cells = np.floor(points / space_dim * bins).astype(np.int64)
+        inside = np.all((cells >= 0) & (cells < bins), axis=1)
+        cells = cells[inside]
+        counts += np.bincount(cells[:, 0] * bins + cells[:, 1], minlength=bins * bins)
+    return counts.reshape(bins, bins), edges
+
+def find_peaks(density, edges, n_peaks=5, neighborhood=5, min_count=1):
+    """
+    Local maxima of an intersection density map, as emitter candidates.
+
+    Parameters:
+    density (ndarray): (bins, bins) counts from intersection_density.
+    edges (ndarray): Bin edges from intersection_density.
+    n_peaks (int): Maximum number of peaks returned, strongest first.
+    neighborhood (int): Side of the square window a peak must be the maximum of; of equal
+        counts within a window only the first (lowest x, then y bin) is a peak.
+    min_count (int): Minimum count of a peak.
+
+    Returns:
+    positions (ndarray): (P, 2) peak positions (bin centres).
+    counts (ndarray): (P,) peak counts.
+    """
+    half = neighborhood // 2
+    window = (neighborhood, neighborhood)
+    windows = sliding_window_view(np.pad(density, half, constant_values=-1), window)
+    is_peak = (density == windows.max(axis=(-2, -1))) & (density >= min_count)
+
+    # Ties go to the cell with the smaller flat index, as in multi_emitter.cluster_points,
+    # so equal neighbouring counts give one peak instead of one per cell
+    index = np.arange(density.size).reshape(density.shape)
+    index_windows = sliding_window_view(np.pad(index, half, constant_values=density.size), window)
+    first_tied = np.where(windows == density[..., None, None], index_windows, density.size).min(axis=(-2, -1))
+    is_peak &= first_tied == index
+
+    xi, yi = np.nonzero(is_peak)
+    order = np.argsort(density[xi, yi])[::-1][:n_peaks]
+    xi, yi = xi[order], yi[order]
+    centres = (edges[:-1] + edges[1:]) / 2
+    return np.stack([centres[xi], centres[yi]], axis=1), density[xi, yi]
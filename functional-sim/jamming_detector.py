@@ -0,0 +1,104 @@
+import numpy as np
+
+
+class JammingDetector:
+    def __init__(self, n_freqs, method="ewma", alpha=0.05, threshold_db=10.0, min_bins=1, warmup=20,
+                 median_step_db=0.5):
+        """
+        Streaming jamming/occupancy detector with an incremental per-bin noise floor.
+
+        Only the current baseline is kept per frequency bin, so memory is O(bins)
+        and each sweep costs a handful of vectorized operations over the bins.
+
+        Parameters:
+        -----------
+        n_freqs : int
+            Number of frequency bins per sweep (columns of the waterfall)
+        method : str
+            "ewma" for an exponentially weighted mean of the dB power, or
+            "median" for a running median estimate (sign-step update, robust to bursts)
+        alpha : float
+            EWMA smoothing factor
+        threshold_db : float
+            A bin is flagged when it exceeds its baseline by more than this
+        min_bins : int
+            Number of flagged bins needed to report an event for the sweep
+        warmup : int
+            Sweeps used to settle the baseline before anything is flagged
+        median_step_db : float
+            Step size of the running median update in dB
+        """
+        if method not in ("ewma", "median"):
+            raise ValueError(f"Unknown method {method!r}, expected 'ewma' or 'median'")
+        self.n_freqs = n_freqs
+        self.method = method
+        self.alpha = alpha
+        self.threshold_db = threshold_db
+        self.min_bins = min_bins
+        self.warmup = warmup
+        self.median_step_db = median_step_db
+        self.baseline = np.full(n_freqs, np.nan)
+        self.n_sweeps = 0
+
+    def update(self, sweep):
+        """
+        Scores one sweep against the baseline, then folds it into the baseline.
+
+        Flagged bins are not folded in, so a long jamming burst does not raise
+        the noise floor it is measured against.
+
+        Parameters:
+        -----------
+        sweep : numpy.ndarray
+            Power per frequency bin in dBm (NaN for missing bins)
+
+        Returns:
+        --------
+        numpy.ndarray
+            Boolean mask of flagged bins
+        bool
+            True when at least min_bins bins are flagged
+        """
+        sweep = np.asarray(sweep, dtype=np.float64)
+        valid = ~np.isnan(sweep)
+        excess = sweep - self.baseline
+
+        if self.n_sweeps < self.warmup:
+            flagged = np.zeros(self.n_freqs, dtype=bool)
+        else:
+            flagged = valid & (excess > self.threshold_db)
+
+        # First observation of a bin initialises its baseline
+        new = valid & np.isnan(self.baseline)
+        self.baseline[new] = sweep[new]
+
+        learn = valid & ~flagged & ~new
+        if self.method == "ewma":
+            self.baseline[learn] += self.alpha * excess[learn]
+        else:
+            self.baseline[learn] += self.median_step_db * np.sign(excess[learn])
+
+        self.n_sweeps += 1
+        return flagged, int(flagged.sum()) >= self.min_bins
+
+    def process(self, power):
+        """
+        Runs update over the rows of a (time x frequency) matrix, e.g. WaterfallBuilder.power.
+
+        Returns:
+        --------
+        numpy.ndarray
+            (time x frequency) boolean mask of flagged bins
+        numpy.ndarray
+            (time,) boolean event flag per sweep
+        """
+        flags = np.zeros(power.shape, dtype=bool)
+        events = np.zeros(len(power), dtype=bool)
+        for i, sweep in enumerate(power):
+            flags[i], events[i] = self.update(sweep)
+        return flags, events
+
+    def reset(self):
+        """Forget the baseline"""
+        self.baseline[:] = np.nan
+        self.n_sweeps = 0
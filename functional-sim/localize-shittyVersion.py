@@ -1,6 +1,7 @@
 import numpy as np
 
 import visualiseTarget as vt
+from bearing_localizer import bearing_lines
 
 def estimate_emitter_location(antennas, angles, weights=None):
     """
@@ -8,21 +9,13 @@ def estimate_emitter_location(antennas, angles, weights=None):
     angles: list of angles θ_i (radians) for each antenna
     weights: list of weights (default: uniform)
     """
-    A = []
-    b = []
-    for (x_i, y_i), theta_i in zip(antennas, angles):
-        sin_theta = np.sin(theta_i)
-        cos_theta = np.cos(theta_i)
-        A.append([sin_theta, -cos_theta])
-        b.append(sin_theta * x_i - cos_theta * y_i)
-    
-    A = np.array(A)
-    b = np.array(b)
+    A, b = bearing_lines(antennas, angles)
     
     if weights is not None:
-        W = np.diag(weights)
-        A_weighted = W @ A
-        b_weighted = W @ b
+        # Same as diag(weights) @ A, without building the N x N matrix
+        weights = np.asarray(weights, dtype=float)
+        A_weighted = A * weights[:, None]
+        b_weighted = b * weights
     else:
         A_weighted = A
         b_weighted = b
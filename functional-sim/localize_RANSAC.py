@@ -1,10 +1,7 @@
-from sklearn.linear_model import RANSACRegressor
 import numpy as np
 
 import visualiseTarget as vt  
 
-import localize_RANSAC as ransac_loc
-
 def generate_antenna_data(pairs=10):
     target_data_list = vt.generate_and_get_target_data(num_pairs=pairs, space_dim=500, resolution=100, emitter_position=np.array([360, 120, 250]), emitter_power=20.0, phi=np.pi/4, antena_std_dev=0.3)
 
@@ -17,25 +14,82 @@ def convert_to_lines(origins, directions):
     """
     Convert direction vectors to lines (a*x + b*y + c = 0)
     """
-    lines = []
-    for origin, direction in zip(origins, directions):
-#        direction = -direction  # Flip the direction vector
-        a, b = -direction[1], direction[0]  # Perpendicular to direction vector
-        c = -(a * origin[0] + b * origin[1])
-        lines.append([a, b, c])
-    return lines
+    origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+    directions = np.asarray(directions, dtype=float).reshape(-1, 2)
+#    directions = -directions  # Flip the direction vectors
+    a, b = -directions[:, 1], directions[:, 0]  # Perpendicular to direction vector
+    c = -(a * origins[:, 0] + b * origins[:, 1])
+    return np.stack([a, b, c], axis=1)
+
+def _line_distances(lines, points):
+    """
+    Perpendicular distance of every (unit-normal) line to every point, shape (lines, points).
+    """
+    return np.abs(lines[:, :2] @ points.T + lines[:, 2:3])
 
-def estimate_emitter_location(origins, directions):
+def _least_squares_point(lines):
     """
-    Estimate the emitter location using RANSAC.
+    Point minimising the summed squared perpendicular distance to the lines.
     """
+    return np.linalg.lstsq(lines[:, :2], -lines[:, 2], rcond=None)[0]
+
+def estimate_emitter_location(origins, directions, n_hypotheses=512, threshold=5.0, refine_iterations=3, seed=None, return_inliers=False):
+    """
+    Estimate the emitter location using RANSAC over bearing-line intersections.
+
+    Every hypothesis is the intersection of two randomly drawn bearing lines. All
+    hypotheses are scored at once by counting the lines that pass within threshold
+    of them, and the best one is refined by least squares on its consensus set.
+
+    Parameters:
+    origins (array-like): (N, 2) bearing origins.
+    directions (array-like): (N, 2) bearing direction vectors.
+    n_hypotheses (int): Number of two-line hypotheses drawn.
+    threshold (float): Inlier distance between a line and the hypothesis, in metres.
+    refine_iterations (int): Least-squares refits, re-selecting inliers each time.
+    seed (int, optional): Seed for the hypothesis sampling.
+    return_inliers (bool): Also return the boolean inlier mask.
+
+    Returns:
+    emitter_location (ndarray): (x, y) estimate, NaN with fewer than two bearings or
+        when every sampled pair of bearings is parallel.
+    inliers (ndarray): (N,) inlier mask, only if return_inliers is True.
+    """
+    rng = np.random.default_rng(seed)
     lines = convert_to_lines(origins, directions)
+    lines = lines / np.linalg.norm(lines[:, :2], axis=1, keepdims=True)
+    n = len(lines)
+    no_estimate = (np.full(2, np.nan), np.zeros(n, dtype=bool)) if return_inliers else np.full(2, np.nan)
+    if n < 2:
+        return no_estimate
+
+    # Minimal hypotheses: intersections of two distinct lines (homogeneous cross product)
+    i = rng.integers(0, n, n_hypotheses)
+    j = (i + rng.integers(1, n, n_hypotheses)) % n
+    crossing = np.cross(lines[i], lines[j])
+    usable = np.abs(crossing[:, 2]) > 1e-9  # Skip (near) parallel pairs
+    hypotheses = crossing[usable, :2] / crossing[usable, 2:3]
+    if not len(hypotheses):
+        return no_estimate
+
+    # Score all hypotheses, in blocks so the (lines x hypotheses) matrix stays bounded
+    block = max(1, 2**24 // max(n, 1))
+    scores = np.concatenate([
+        (_line_distances(lines, hypotheses[start:start + block]) < threshold).sum(axis=0)
+        for start in range(0, len(hypotheses), block)
+    ])
+    emitter_location = hypotheses[np.argmax(scores)]
+
+    # Refine on the consensus set
+    inliers = _line_distances(lines, emitter_location[None, :])[:, 0] < threshold
+    for _ in range(refine_iterations):
+        if inliers.sum() < 2:
+            break
+        emitter_location = _least_squares_point(lines[inliers])
+        inliers = _line_distances(lines, emitter_location[None, :])[:, 0] < threshold
 
-    # Solve with RANSAC
-    X = np.array(lines)[:, :2]  # Coefficients (a, b)
-    y = -np.array(lines)[:, 2]  # -c
-    ransac = RANSACRegressor().fit(X, y)
-    emitter_location = ransac.estimator_.coef_
+    if return_inliers:
+        return emitter_location, inliers
     return emitter_location
 
 # Generate antenna data
@@ -0,0 +1,184 @@
+import numpy as np
+
+import intersection_map as im
+from bearing_localizer import bearing_lines, fuse_bearings
+
+
+def _hash_cells(points, cell_size):
+    """
+    Grid-hash keys of points: one int64 per cell, neighbours are +-1 in x or y.
+    """
+    cells = np.floor(points / cell_size).astype(np.int64)
+    return cells, (cells[:, 0] << 32) + cells[:, 1]
+
+def cluster_points(points, cell_size=5.0, min_count=20, background_factor=5.0):
+    """
+    Density clustering of 2-D points with a grid hash instead of all-pairs distances.
+
+    Points are hashed into square cells and each cell's 8 neighbours are found by
+    looking up the neighbouring keys in the sorted key array. A cluster is a cell that
+    holds at least as many points as all of its neighbours, at least min_count points
+    and at least background_factor times the median occupied-cell count (the clutter
+    of chance intersections). Its centre is the mean of the points in that 3x3 block.
+
+    Parameters:
+    points (ndarray): (M, 2) points, e.g. bearing intersections.
+    cell_size (float): Side of a hash cell in metres.
+    min_count (int): Minimum points in a peak cell.
+    background_factor (float): Minimum ratio of a peak cell's count to the median cell count.
+
+    Returns:
+    centres (ndarray): (K, 2) centre of each cluster, strongest first.
+    counts (ndarray): (K,) number of points in the 3x3 block of each cluster.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if not len(points):
+        return np.empty((0, 2)), np.empty(0, dtype=np.int64)
+    _, keys = _hash_cells(points, cell_size)
+    unique_keys, inverse, cell_counts = np.unique(keys, return_inverse=True, return_counts=True)
+    sums = np.zeros((len(unique_keys), 2))
+    np.add.at(sums, inverse, points)
+
+    # Neighbour lookup through the sorted hash keys, missing neighbours count as empty
+    block_counts = cell_counts.copy()
+    block_sums = sums.copy()
+    is_peak = np.ones(len(unique_keys), dtype=bool)
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            if not (dx or dy):
+                continue
+            target = unique_keys + (dx << 32) + dy
+            pos = np.minimum(np.searchsorted(unique_keys, target), len(unique_keys) - 1)
+            found = unique_keys[pos] == target
+            neighbour_counts = np.where(found, cell_counts[pos], 0)
+            # Ties go to the cell with the smaller key so a plateau gives one peak
+            is_peak &= (cell_counts > neighbour_counts) | ((cell_counts == neighbour_counts) & (target > unique_keys))
+            block_counts += neighbour_counts
+            block_sums += np.where(found[:, None], sums[pos], 0)
+
+    threshold = max(min_count, background_factor * np.median(cell_counts))
+    peaks = np.flatnonzero(is_peak & (cell_counts >= threshold))
+    order = peaks[np.argsort(cell_counts[peaks])[::-1]]
+    return block_sums[order] / block_counts[order, None], block_counts[order]
+
+def associate_bearings(origins, angles, centres, gate=10.0):
+    """
+    Assigns every bearing to the cluster centre closest to its line, among the
+    centres in front of the bearing and within gate.
+
+    Parameters:
+    origins (ndarray): (N, 2) bearing origins.
+    angles (ndarray): (N,) bearing angles in radians.
+    centres (ndarray): (K, 2) candidate emitter positions.
+    gate (float): Maximum perpendicular distance (m) between a bearing line and its centre.
+
+    Returns:
+    labels (ndarray): (N,) index of the associated centre, -1 for unassociated bearings.
+    """
+    origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+    A, b = bearing_lines(origins, angles)
+    if not len(centres):
+        return np.full(len(b), -1)
+    centres = np.asarray(centres, dtype=float)
+    # (bearings x centres) perpendicular distances, K is small
+    distance = np.abs(A @ centres.T - b[:, None])
+    # Along-bearing offset: A is the bearing direction rotated by -90 degrees
+    along = (centres[None, :, 0] - origins[:, None, 0]) * -A[:, None, 1] + (centres[None, :, 1] - origins[:, None, 1]) * A[:, None, 0]
+    distance[along <= 0] = np.inf
+    labels = np.argmin(distance, axis=1)
+    labels[distance[np.arange(len(b)), labels] > gate] = -1
+    return labels
+
+def _fit_clusters(origins, angles, weights, labels, n_clusters):
+    fits = []
+    for k in range(n_clusters):
+        members = labels == k
+        if members.sum() < 2:
+            fits.append(None)
+            continue
+        position, covariance, gdop = fuse_bearings(origins[members], angles[members],
+                                                   None if weights is None else weights[members])
+        fits.append({"position": position, "covariance": covariance, "gdop": gdop,
+                     "n_bearings": int(members.sum())})
+    return fits
+
+def localize_emitters(origins, angles, weights=None, space_dim=500, n_pairs=10**6, cell_size=5.0, min_count=20,
+                      gate=10.0, min_bearings=10, min_fraction=0.2, seed=None):
+    """
+    Localizes several emitters from one pool of bearings in a single pass.
+
+    Intersections of sampled bearing pairs (in front of both bearings) are clustered
+    with a grid hash, each bearing is associated with the nearest cluster within gate,
+    and every cluster is fitted with bearing_localizer.fuse_bearings.
+
+    Clutter peaks near real emitters (where bearings of several emitters cross) fit
+    their bearings just as well, so every cluster then claims, most bearings first,
+    the still unclaimed bearings within 3 robust standard deviations of its fitted
+    position. Clutter peaks are left with few bearings and clusters below min_bearings
+    or below min_fraction of the largest claim are dropped. Bearings are finally associated
+    with the kept cluster they fit best relative to its spread, and refitted.
+
+    Parameters:
+    origins (ndarray): (N, 2) bearing origins.
+    angles (ndarray): (N,) bearing angles in radians.
+    weights (ndarray, optional): (N,) per-bearing confidences.
+    space_dim (float): Side of the square search area; intersections outside are dropped.
+    n_pairs (int): Number of random bearing pairs intersected.
+    cell_size (float): Grid-hash cell size in metres.
+    min_count (int): Minimum intersections in a cluster's peak cell.
+    gate (float): Association gate of the first pass in metres.
+    min_bearings (int): Minimum bearings for an emitter to be kept.
+    min_fraction (float): Minimum bearings for an emitter to be kept, relative to the largest cluster.
+    seed (int, optional): Seed for the pair sampling.
+
+    Returns:
+    emitters (list): One dict per emitter with "position", "covariance", "gdop" and "n_bearings".
+    labels (ndarray): (N,) emitter index of every bearing, -1 for unassociated.
+    """
+    origins = np.asarray(origins, dtype=float).reshape(-1, 2)
+    angles = np.asarray(angles, dtype=float).reshape(-1)
+    weights = None if weights is None else np.asarray(weights, dtype=float)
+    directions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+    if len(angles) < 2:
+        return [], np.full(len(angles), -1)
+
+    points = np.concatenate([np.empty((0, 2))] + list(im.iter_sampled_intersections(
+        origins, directions, n_pairs, forward_only=True, seed=seed)))
+    points = points[np.all((points >= 0) & (points <= space_dim), axis=1)]
+    if not len(points):
+        return [], np.full(len(angles), -1)
+    centres, _ = cluster_points(points, cell_size, min_count)
+    labels = associate_bearings(origins, angles, centres, gate)
+    fits = [fit for fit in _fit_clusters(origins, angles, weights, labels, len(centres)) if fit is not None]
+    if not fits:
+        return [], np.full(len(angles), -1)
+
+    A, b = bearing_lines(origins, angles)
+    positions = np.array([fit["position"] for fit in fits])
+    residual = np.abs(A @ positions.T - b[:, None])
+    nearest = np.argmin(residual, axis=1)
+    scales = np.array([1.4826 * np.median(residual[nearest == k, k]) if (nearest == k).any() else 0.0
+                       for k in range(len(fits))])
+    normalized = residual / np.maximum(scales, 1e-6)
+
+    # Clutter test: clusters claim bearings greedily, most bearings first
+    order = np.argsort([-fit["n_bearings"] for fit in fits], kind="stable")
+    claimed = np.full(len(angles), -1)
+    for k in order:
+        claimed[(claimed == -1) & (normalized[:, k] <= 3)] = k
+    claims = np.bincount(claimed[claimed >= 0], minlength=len(fits))
+    keep = np.flatnonzero(claims >= max(min_bearings, min_fraction * claims.max()))
+    if not len(keep):
+        return [], np.full(len(angles), -1)
+
+    # Final association among the kept clusters, by residual relative to each cluster's spread
+    normalized = normalized[:, keep]
+    labels = np.argmin(normalized, axis=1)
+    labels[normalized[np.arange(len(labels)), labels] > 3] = -1
+    fits = _fit_clusters(origins, angles, weights, labels, len(keep))
+
+    # Drop clusters left with fewer than 2 bearings and renumber the rest
+    fitted = np.array([fit is not None for fit in fits])
+    renumber = np.where(fitted, np.cumsum(fitted) - 1, -1)
+    labels = np.where(labels >= 0, renumber[labels], -1)
+    return [fit for fit in fits if fit is not None], labels
@@ -0,0 +1,94 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import rf_simulation as rfSim
+
+
+def _slab_bounds(resolution, rows_per_chunk, workers):
+    # At least a few slabs per worker so uneven slabs don't leave cores idle
+    rows = max(1, min(rows_per_chunk, -(-resolution // (4 * workers))))
+    return [(start, min(start + rows, resolution)) for start in range(0, resolution, rows)]
+
+def _process_slab_shm(emitters, axis, start, stop, shm_name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        rfSim._accumulate_field_slab(emitters, axis, start, stop, out[start:stop])
+        del out
+    finally:
+        shm.close()
+
+def _process_slab_memmap(emitters, axis, start, stop, path):
+    out = np.load(path, mmap_mode='r+')
+    rfSim._accumulate_field_slab(emitters, axis, start, stop, out[start:stop])
+    out.flush()
+
+def compute_rf_field_strength_parallel(emitters, space_dim, resolution, dtype=np.float64, out=None,
+                                       workers=None, backend="thread", max_chunk_bytes=64 * 2**20):
+    """
+    Parallel version of rf_simulation.compute_rf_field_strength_chunked.
+
+    The volume is split into slabs of y-rows and each slab (with all of its
+    emitters) is one task on the worker pool, so workers never write to the
+    same memory.
+
+    Parameters:
+    emitters (list): List of emitters with their positions and powers.
+    space_dim (int): The dimension of the 3D space.
+    resolution (int): The resolution of the 3D space.
+    dtype (data-type): Output and working precision.
+    out (ndarray or str, optional): Preallocated output array, or a .npy path to memory-map.
+    workers (int, optional): Size of the pool. Defaults to os.cpu_count().
+    backend (str): "thread" (NumPy releases the GIL in the heavy loops) or "process",
+        where workers write into shared memory (or straight into the .npy file).
+    max_chunk_bytes (int): Approximate temporary memory budget per worker.
+
+    Returns:
+    field_strength (ndarray): The RF field strength at each point, indexed like the meshgrid (y, x, z).
+    """
+    if backend not in ("thread", "process"):
+        raise ValueError(f"Unknown backend {backend!r}, expected 'thread' or 'process'")
+
+    dtype = np.dtype(dtype).type
+    workers = workers or os.cpu_count() or 1
+    shape = (resolution, resolution, resolution)
+    axis = np.linspace(0, space_dim, resolution).astype(dtype)
+    bounds = _slab_bounds(resolution, rfSim._rows_per_chunk(resolution, dtype, max_chunk_bytes), workers)
+
+    if backend == "thread":
+        out = rfSim._prepare_field_output(out, shape, dtype)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(rfSim._accumulate_field_slab, emitters, axis, start, stop, out[start:stop])
+                       for start, stop in bounds]
+            for future in futures:
+                future.result()
+        return out
+
+    if isinstance(out, (str, os.PathLike)):
+        # Workers open the same file, no extra copy needed
+        result = rfSim._prepare_field_output(out, shape, dtype)
+        result.flush()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_process_slab_memmap, emitters, axis, start, stop, os.fspath(out))
+                       for start, stop in bounds]
+            for future in futures:
+                future.result()
+        return result
+
+    result = rfSim._prepare_field_output(out, shape, dtype)
+    shm = shared_memory.SharedMemory(create=True, size=max(1, result.nbytes))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_process_slab_shm, emitters, axis, start, stop, shm.name, shape, dtype)
+                       for start, stop in bounds]
+            for future in futures:
+                future.result()
+        shared = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        result[...] = shared
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+    return result
@@ -0,0 +1,123 @@
+import numpy as np
+
+from bearing_localizer import bearing_log_likelihood
+
+
+class ParticleTracker:
+    def __init__(self, n_particles=100000, bounds=(0, 500, 0, 500), max_speed=5.0, process_noise=1.0,
+                 bearing_sigma=0.05, resample_threshold=0.5, seed=None):
+        """
+        Particle filter for a moving emitter, driven by batches of bearings.
+
+        The particle cloud is a fixed set of arrays (position, velocity and log-weight
+        per particle), so every step is a handful of array-wide operations and memory
+        does not grow with time.
+
+        Parameters:
+        -----------
+        n_particles : int
+            Number of particles
+        bounds : tuple
+            (x_min, x_max, y_min, y_max) of the initial uniform position prior
+        max_speed : float
+            Initial velocities are drawn uniformly up to this speed (m/s)
+        process_noise : float
+            Standard deviation of the random acceleration (m/s^2)
+        bearing_sigma : float
+            Bearing noise standard deviation in radians
+        resample_threshold : float
+            Resample when the effective sample size drops below this fraction of n_particles
+        seed : int, optional
+            Seed for numpy.random.default_rng
+        """
+        self.rng = np.random.default_rng(seed)
+        self.n_particles = n_particles
+        self.process_noise = process_noise
+        self.bearing_sigma = bearing_sigma
+        self.resample_threshold = resample_threshold
+
+        x_min, x_max, y_min, y_max = bounds
+        self.position = np.column_stack([self.rng.uniform(x_min, x_max, n_particles),
+                                         self.rng.uniform(y_min, y_max, n_particles)])
+        speed = self.rng.uniform(0, max_speed, n_particles)
+        heading = self.rng.uniform(-np.pi, np.pi, n_particles)
+        self.velocity = np.column_stack([speed * np.cos(heading), speed * np.sin(heading)])
+        self.log_weight = np.full(n_particles, -np.log(n_particles))
+
+    @property
+    def weights(self):
+        """Normalised particle weights"""
+        w = np.exp(self.log_weight - self.log_weight.max())
+        return w / w.sum()
+
+    def predict(self, dt):
+        """
+        Nearly-constant-velocity motion step for all particles.
+
+        Parameters:
+        -----------
+        dt : float
+            Time since the last step in seconds
+        """
+        accel = self.rng.normal(0, self.process_noise, (self.n_particles, 2))
+        self.position += self.velocity * dt + 0.5 * accel * dt**2
+        self.velocity += accel * dt
+
+    def update(self, origins, angles, weights=None):
+        """
+        Weights the particles by the likelihood of a batch of new bearings, O(particles x bearings).
+
+        Parameters:
+        -----------
+        origins : numpy.ndarray
+            (B, 2) bearing origins
+        angles : numpy.ndarray
+            (B,) bearing angles in radians
+        weights : numpy.ndarray, optional
+            (B,) per-bearing confidences
+        """
+        self.log_weight += bearing_log_likelihood(self.position, origins, angles, self.bearing_sigma, weights)
+        self.log_weight -= self.log_weight.max()
+        self.log_weight -= np.log(np.exp(self.log_weight).sum())
+        if self.effective_sample_size() < self.resample_threshold * self.n_particles:
+            self.resample()
+
+    def effective_sample_size(self):
+        """1 / sum(w^2) of the normalised weights"""
+        return 1.0 / np.sum(self.weights**2)
+
+    def resample(self):
+        """Systematic resampling: one uniform draw, n_particles evenly spaced pointers"""
+        cumulative = np.cumsum(self.weights)
+        cumulative[-1] = 1.0
+        pointers = (self.rng.uniform() + np.arange(self.n_particles)) / self.n_particles
+        index = np.searchsorted(cumulative, pointers)
+        self.position = self.position[index]
+        self.velocity = self.velocity[index]
+        self.log_weight = np.full(self.n_particles, -np.log(self.n_particles))
+
+    def step(self, dt, origins, angles, weights=None):
+        """predict then update, returns the new estimate"""
+        self.predict(dt)
+        self.update(origins, angles, weights)
+        return self.estimate()
+
+    def estimate(self):
+        """
+        Weighted mean and covariance of the particle cloud.
+
+        Returns:
+        --------
+        numpy.ndarray
+            (x, y) position estimate
+        numpy.ndarray
+            (vx, vy) velocity estimate
+        numpy.ndarray
+            2x2 position covariance
+        """
+        w = self.weights
+        position = w @ self.position
+        velocity = w @ self.velocity
+        centred = self.position - position
+        covariance = (centred * w[:, None]).T @ centred
+        return position, velocity, covariance
@@ -0,0 +1,85 @@
+import numpy as np
+
+# Same value as rf_simulation.compute_antenna_signal_strength used
+SPEED_OF_LIGHT = 3e8
+
+
+def wavelengths(frequencies):
+    """Wavelengths in metres of frequencies in Hz, e.g. the sweep axis WaterfallBuilder.frequencies"""
+    return SPEED_OF_LIGHT / np.asarray(frequencies, dtype=float)
+
+
+class FriisEngine:
+    def __init__(self, antenna_positions, emitters):
+        """
+        Free-space (Friis) received power for every antenna, emitter and frequency.
+
+        The antenna-emitter distances are computed once and the frequency-independent
+        spreading term 1 / (4 pi d)^2 is cached, so a frequency axis only adds the
+        wavelength^2 factor: Pr = Pt * Gt * Gr * lambda^2 / (4 pi d)^2.
+
+        Parameters:
+        -----------
+        antenna_positions : array-like
+            (A, 3) antenna coordinates
+        emitters : list
+            Emitters with their positions and powers, as in rf_simulation
+        """
+        self.antenna_positions = np.asarray(antenna_positions, dtype=float).reshape(-1, 3)
+        self.emitter_positions = np.array([e["position"] for e in emitters], dtype=float).reshape(-1, 3)
+        self.emitter_power = np.array([e["power"] for e in emitters], dtype=float)
+
+        offsets = self.emitter_positions[None, :, :] - self.antenna_positions[:, None, :]
+        self.distance = np.sqrt(np.einsum('aek,aek->ae', offsets, offsets))
+        self.spreading = 1 / (4 * np.pi * self.distance)**2
+
+    def received_power(self, frequencies, gains=None, emitter_power=None):
+        """
+        Power received by each antenna from each emitter at each frequency.
+
+        Parameters:
+        -----------
+        frequencies : array-like
+            (F,) frequencies in Hz
+        gains : array-like, optional
+            Combined antenna gains Gt * Gr, broadcastable to (A, E), e.g. from
+            antenna.directional_antenna_matrix with a unit field amplitude
+        emitter_power : array-like, optional
+            (E,) or (E, F) transmit powers, overriding the emitters' "power"
+
+        Returns:
+        --------
+        numpy.ndarray
+            (A, E, F) received power, in the units of the emitter powers
+        """
+        spreading, power = self._terms(gains, emitter_power)
+        wavelength_squared = wavelengths(frequencies)**2
+        if power.ndim == 2:
+            return spreading[:, :, None] * power[None, :, :] * wavelength_squared
+        return (spreading * power)[:, :, None] * wavelength_squared
+
+    def total_power(self, frequencies, gains=None, emitter_power=None, db=True):
+        """
+        Power received by each antenna from all emitters together, at each frequency,
+        without forming the (A, E, F) array.
+
+        Parameters are those of received_power.
+
+        Returns:
+        --------
+        numpy.ndarray
+            (A, F) total received power, in dB if db is True
+        """
+        spreading, power = self._terms(gains, emitter_power)
+        wavelength_squared = wavelengths(frequencies)**2
+        if power.ndim == 2:
+            # Per-frequency transmit powers: one (A x E) @ (E x F) product
+            total = (spreading @ power) * wavelength_squared
+        else:
+            total = np.outer(spreading @ power, wavelength_squared)
+        return 10 * np.log10(total) if db else total
+
+    def _terms(self, gains, emitter_power):
+        spreading = self.spreading if gains is None else self.spreading * gains
+        power = self.emitter_power if emitter_power is None else np.asarray(emitter_power, dtype=float)
+        return spreading, power
@@ -3,17 +3,20 @@ import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 import os
 
+from propagation import FriisEngine
+
 # Ensure the directory exists
 output_dir = '/Users/allisonmahmood/Documents/GitHub/SGM/tests2'
 os.makedirs(output_dir, exist_ok=True)
 
-def setup_3d_space(space_dim, resolution):
+def setup_3d_space(space_dim, resolution, sparse=False):
     # print("Running setup_3d_space")
     # Define the 3D space using a grid
     x = np.linspace(0, space_dim, resolution)  # resolution points along x-axis
     y = np.linspace(0, space_dim, resolution)  # resolution points along y-axis
     z = np.linspace(0, space_dim, resolution)  # resolution points along z-axis
-    X, Y, Z = np.meshgrid(x, y, z)
+    # sparse=True gives an open grid: X, Y, Z keep one axis each and broadcast to the full volume
+    X, Y, Z = np.meshgrid(x, y, z, sparse=sparse)
     return X, Y, Z
 
 def compute_rf_field_strength(emitters, X, Y, Z):
@@ -23,12 +26,12 @@ def compute_rf_field_strength(emitters, X, Y, Z):
     
     Parameters:
     emitters (list): List of emitters with their positions and powers.
-    X, Y, Z (ndarray): The coordinates of the points in the 3D space.
+    X, Y, Z (ndarray): The coordinates of the points in the 3D space, dense or open (sparse) grid.
     
     Returns:
     field_strength (ndarray): The RF field strength at each point in the 3D space.
     """
-    field_strength = np.zeros_like(X)
+    field_strength = np.zeros(np.broadcast_shapes(X.shape, Y.shape, Z.shape))
     for emitter in emitters:
         distance = np.sqrt((X - emitter["position"][0])**2 + (Y - emitter["position"][1])**2 + (Z - emitter["position"][2])**2)
         field_strength += emitter["power"] / (distance + 1e-6)  # Avoid division by zero
@@ -53,6 +56,88 @@ def compute_rf_field_strength(emitters, X, Y, Z):
             field_strength += emitter["power"] / (distance + 1e-6)  # Avoid division by zero
         return field_strength
 
+def compute_rf_field_strength_chunked(emitters, space_dim, resolution, dtype=np.float64, out=None, max_chunk_bytes=64 * 2**20):
+    # print("Running compute_rf_field_strength_chunked")
+    """
+    Computes the same field as compute_rf_field_strength on the setup_3d_space grid,
+    one slab of y-rows at a time so peak memory is bounded by max_chunk_bytes.
+    
+    Parameters:
+    emitters (list): List of emitters with their positions and powers.
+    space_dim (int): The dimension of the 3D space.
+    resolution (int): The resolution of the 3D space.
+    dtype (data-type): Output and working precision, e.g. np.float32 to halve memory.
+    out (ndarray or str, optional): Preallocated (resolution,)*3 array, or a .npy path
+        that is created as a memory-mapped output.
+    max_chunk_bytes (int): Approximate budget for the per-slab temporaries.
+    
+    Returns:
+    field_strength (ndarray): The RF field strength at each point, indexed like the meshgrid (y, x, z).
+    """
+    dtype = np.dtype(dtype).type
+    shape = (resolution, resolution, resolution)
+    out = _prepare_field_output(out, shape, dtype)
+    axis = np.linspace(0, space_dim, resolution).astype(dtype)
+    rows_per_chunk = _rows_per_chunk(resolution, dtype, max_chunk_bytes)
+
+    for start in range(0, resolution, rows_per_chunk):
+        stop = min(start + rows_per_chunk, resolution)
+        # Accumulate straight into the output (or memmap) slab
+        _accumulate_field_slab(emitters, axis, start, stop, out[start:stop])
+
+    return out
+
+def _prepare_field_output(out, shape, dtype):
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if isinstance(out, (str, os.PathLike)):
+        return np.lib.format.open_memmap(out, mode='w+', dtype=dtype, shape=shape)
+    if out.shape != shape:
+        raise ValueError(f"out has shape {out.shape}, expected {shape}")
+    return out
+
+def _rows_per_chunk(resolution, dtype, max_chunk_bytes):
+    # Two slab-sized temporaries per row block: the distance and the broadcast sum under the sqrt
+    row_bytes = resolution * resolution * np.dtype(dtype).itemsize * 2
+    return max(1, int(max_chunk_bytes // row_bytes))
+
+def _accumulate_field_slab(emitters, axis, start, stop, slab):
+    """
+    Writes the field for y-rows start:stop of the meshgrid (y, x, z) volume into slab.
+    """
+    dtype = slab.dtype.type
+    x = axis[None, :, None]
+    y = axis[start:stop, None, None]
+    z = axis[None, None, :]
+    slab[...] = 0
+    distance = np.empty(slab.shape, dtype=dtype)
+    for emitter in emitters:
+        px, py, pz = (dtype(c) for c in np.ravel(emitter["position"]))
+        np.sqrt((x - px)**2 + (y - py)**2 + (z - pz)**2, out=distance)
+        distance += dtype(1e-6)  # Avoid division by zero
+        np.divide(dtype(emitter["power"]), distance, out=distance)
+        slab += distance
+
+def compute_rf_field_strength_at_points(emitters, points):
+    # print("Running compute_rf_field_strength_at_points")
+    """
+    Computes the RF field strength at arbitrary points without building a grid.
+    
+    Parameters:
+    emitters (list): List of emitters with their positions and powers.
+    points (array-like): (N, 3) array of (x, y, z) query coordinates.
+    
+    Returns:
+    field_strength (ndarray): (N,) RF field strength at each query point.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    emitter_positions = np.array([emitter["position"] for emitter in emitters], dtype=float).reshape(-1, 3)
+    emitter_powers = np.array([emitter["power"] for emitter in emitters], dtype=float)
+
+    # (N, E) distance between every query point and every emitter
+    distance = np.linalg.norm(points[:, None, :] - emitter_positions[None, :, :], axis=-1)
+    return (emitter_powers / (distance + 1e-6)).sum(axis=1)  # Avoid division by zero
+
 def add_antenna(ax, position, label):
     # print("Running add_antenna")
     """
@@ -73,29 +158,17 @@ def compute_antenna_signal_strength(emitters, antenna_position, frequency_value)
     Parameters:
     emitters (list): List of emitters with their positions and powers.
     antenna_position (array-like): The (x, y, z) coordinates of the antenna.
-    frequency_value (float): The frequency in GHz.
+    frequency_value (float or array-like): The frequency in GHz, or an array of frequencies.
     
     Returns:
-    signal_strength_db (float): The signal strength received by the antenna in dB.
+    signal_strength_db (float or ndarray): The signal strength received by the antenna in dB, one per frequency.
+    For many antennas or a sweep axis in Hz use propagation.FriisEngine directly.
     """
-    total_power = 0
-    for emitter in emitters:
-        # Calculate the distance between the emitter and the antenna
-        distance = np.sqrt(np.sum((emitter["position"] - antenna_position)**2))
-        
-        # Calculate the wavelength in meters
-        wavelength = 3e8 / (frequency_value * 1e9)
-        
-        # Calculate the path loss using the Friis transmission equation
-        path_loss = (4 * np.pi * distance / wavelength)**2
-        
-        # Calculate the received power
-        total_power += emitter["power"] / path_loss
-    
-    # Calculate the received power in dB
-    signal_strength_db = 10 * np.log10(total_power)
+    frequencies = np.asarray(frequency_value, dtype=float) * 1e9
+    engine = FriisEngine(antenna_position, emitters)
+    signal_strength_db = engine.total_power(frequencies.reshape(-1))[0].reshape(frequencies.shape)
     
-    return signal_strength_db
+    return signal_strength_db[()]
 
 def visualize_all(space_dim, emitters, antenna_positions, field_strength, X, Y, Z):
     # print("Running visualize_all")
@@ -116,6 +189,8 @@ def visualize_all(space_dim, emitters, antenna_positions, field_strength, X, Y,
         ax.scatter(emitter["position"][0], emitter["position"][1], emitter["position"][2], color='r', s=100)
     for i, antenna_position in enumerate(antenna_positions):
         add_antenna(ax, antenna_position, f'Antenna {i+1}')
+    # Open grids from setup_3d_space(sparse=True) are expanded as views for plotting
+    X, Y, Z = np.broadcast_arrays(X, Y, Z)
     sc = ax.scatter(X, Y, Z, c=np.log10(field_strength), cmap='viridis', marker='o', vmin=0, vmax=np.log10(max(emitter["power"] for emitter in emitters)))
     # print("Visualization setup complete")
     plt.colorbar(sc, ax=ax, label='Log Field Strength (dB)')
@@ -0,0 +1,85 @@
+import numpy as np
+
+
+def _parse_block(lines, delimiter, n_bins):
+    """
+    Parses a list of sweep rows into typed column arrays.
+    """
+    fields = [line.split(delimiter) for line in lines]
+    timestamps = np.array([f"{row[0].strip()}T{row[1].strip()}" for row in fields], dtype="datetime64[us]")
+    numeric = np.array([row[2:6 + n_bins] for row in fields], dtype=np.float64)
+    return {
+        "timestamp": timestamps,
+        "hz_start": numeric[:, 0].astype(np.int64),
+        "hz_stop": numeric[:, 1].astype(np.int64),
+        "bucket_size": numeric[:, 2],
+        "samples": numeric[:, 3].astype(np.int32),
+        "bins": numeric[:, 4:].astype(np.float32),
+    }
+
+def iter_sweep_blocks(path, chunk_rows=65536, delimiter=";"):
+    """
+    Streams a hackrf_sweep-style capture (date;time;hz_start;hz_stop;bucket_size;samples;b1..bN)
+    in blocks of at most chunk_rows rows, so memory stays constant for any file size.
+
+    Parameters:
+    -----------
+    path : str
+        Path to the capture, e.g. jamming_data_t2_processed.csv
+    chunk_rows : int
+        Number of rows parsed per yielded block
+    delimiter : str
+        Column separator (';' for the processed captures, ',' for raw hackrf_sweep output)
+
+    Yields:
+    -------
+    dict
+        Column block with keys "timestamp" (datetime64[us]), "hz_start", "hz_stop" (int64),
+        "bucket_size" (float64), "samples" (int32) and "bins" (rows x N float32, dBm)
+    """
+    n_bins = None
+    lines = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("date"):
+                # Header row, only the bin count is needed from it
+                n_bins = len(line.split(delimiter)) - 6
+                continue
+            if n_bins is None:
+                n_bins = len(line.split(delimiter)) - 6
+            lines.append(line)
+            if len(lines) == chunk_rows:
+                yield _parse_block(lines, delimiter, n_bins)
+                lines = []
+    if lines:
+        yield _parse_block(lines, delimiter, n_bins)
+
+def segment_frequencies(hz_start, hz_stop, n_bins):
+    """
+    Centre frequency of each bin in each segment.
+
+    Parameters:
+    -----------
+    hz_start, hz_stop : numpy.ndarray
+        Segment edges in Hz, one per row
+    n_bins : int
+        Number of bins per segment
+
+    Returns:
+    --------
+    numpy.ndarray
+        (rows, n_bins) bin centre frequencies in Hz
+    """
+    hz_start = np.asarray(hz_start, dtype=np.float64)[:, None]
+    width = (np.asarray(hz_stop, dtype=np.float64)[:, None] - hz_start) / n_bins
+    return hz_start + width * (np.arange(n_bins) + 0.5)
+
+def load_sweeps(path, delimiter=";"):
+    """
+    Convenience loader that concatenates all blocks of a (small) capture.
+    """
+    blocks = list(iter_sweep_blocks(path, delimiter=delimiter))
+    return {key: np.concatenate([block[key] for block in blocks]) for key in blocks[0]}
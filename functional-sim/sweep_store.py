@@ -0,0 +1,110 @@
+import os
+
+import numpy as np
+
+import sweep_ingest as si
+
+
+def _scan_axes(csv_path, delimiter, chunk_rows):
+    """
+    First pass over a capture: collects the sorted timestamp axis and the frequency segments.
+    """
+    timestamps = []
+    segments = set()
+    n_bins = None
+    for block in si.iter_sweep_blocks(csv_path, chunk_rows=chunk_rows, delimiter=delimiter):
+        timestamps.append(np.unique(block["timestamp"]))
+        segments.update(zip(block["hz_start"].tolist(), block["hz_stop"].tolist()))
+        n_bins = block["bins"].shape[1]
+    time_axis = np.unique(np.concatenate(timestamps))
+    segments = np.array(sorted(segments), dtype=np.int64)
+    freq_axis = si.segment_frequencies(segments[:, 0], segments[:, 1], n_bins).ravel()
+    return time_axis, segments, freq_axis, n_bins
+
+def convert_csv_to_store(csv_path, store_dir, delimiter=";", chunk_rows=65536):
+    """
+    Converts a sweep CSV into a memory-mappable store in two streaming passes.
+
+    The store directory holds power.npy (time x frequency float32 dBm, NaN where a
+    segment was never seen), timestamps.npy (int64 microseconds since epoch, sorted)
+    and frequencies.npy (bin centre frequencies in Hz, sorted).
+
+    Parameters:
+    -----------
+    csv_path : str
+        Path of the capture
+    store_dir : str
+        Output directory, created if needed
+    delimiter : str
+        Column separator of the capture
+    chunk_rows : int
+        Rows parsed per block
+
+    Returns:
+    --------
+    SweepStore
+        The opened store
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    time_axis, segments, freq_axis, n_bins = _scan_axes(csv_path, delimiter, chunk_rows)
+
+    power = np.lib.format.open_memmap(os.path.join(store_dir, "power.npy"), mode="w+",
+                                      dtype=np.float32, shape=(len(time_axis), len(freq_axis)))
+    power[...] = np.nan
+    for block in si.iter_sweep_blocks(csv_path, chunk_rows=chunk_rows, delimiter=delimiter):
+        rows = np.searchsorted(time_axis, block["timestamp"])
+        seg = np.searchsorted(segments[:, 0], block["hz_start"])
+        cols = seg[:, None] * n_bins + np.arange(n_bins)
+        # Repeated segments within one timestamp: the later row wins
+        power[rows[:, None], cols] = block["bins"]
+    power.flush()
+    del power
+
+    np.save(os.path.join(store_dir, "timestamps.npy"), time_axis.astype("datetime64[us]").astype(np.int64))
+    np.save(os.path.join(store_dir, "frequencies.npy"), freq_axis)
+    return SweepStore(store_dir)
+
+
+class SweepStore:
+    def __init__(self, store_dir):
+        """
+        Read-only, memory-mapped view of a store written by convert_csv_to_store.
+
+        Parameters:
+        -----------
+        store_dir : str
+            Directory holding power.npy, timestamps.npy and frequencies.npy
+        """
+        self.store_dir = store_dir
+        self.power = np.load(os.path.join(store_dir, "power.npy"), mmap_mode="r")
+        self.timestamps = np.load(os.path.join(store_dir, "timestamps.npy")).astype("datetime64[us]")
+        self.frequencies = np.load(os.path.join(store_dir, "frequencies.npy"))
+
+    def time_slice(self, start=None, stop=None):
+        """Row slice for start <= t < stop (datetime64 or ISO strings, None for open ends)"""
+        i0 = 0 if start is None else np.searchsorted(self.timestamps, np.datetime64(start, "us"), side="left")
+        i1 = len(self.timestamps) if stop is None else np.searchsorted(self.timestamps, np.datetime64(stop, "us"), side="left")
+        return slice(int(i0), int(i1))
+
+    def frequency_slice(self, f_min=None, f_max=None):
+        """Column slice for f_min <= f <= f_max in Hz (None for open ends)"""
+        j0 = 0 if f_min is None else np.searchsorted(self.frequencies, f_min, side="left")
+        j1 = len(self.frequencies) if f_max is None else np.searchsorted(self.frequencies, f_max, side="right")
+        return slice(int(j0), int(j1))
+
+    def query(self, start=None, stop=None, f_min=None, f_max=None):
+        """
+        Time window x frequency band query. All returned arrays are views, nothing is copied.
+
+        Returns:
+        --------
+        numpy.ndarray
+            Timestamps of the selected rows
+        numpy.ndarray
+            Frequencies of the selected columns in Hz
+        numpy.ndarray
+            Power (rows x columns) in dBm, backed by the memory map
+        """
+        rows = self.time_slice(start, stop)
+        cols = self.frequency_slice(f_min, f_max)
+        return self.timestamps[rows], self.frequencies[cols], self.power[rows, cols]
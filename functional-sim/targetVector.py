@@ -7,13 +7,18 @@ import antenna as ant
 
 import extras as ex
 
+from field_cache import default_cache
 
-def setup_environment(space_dim, resolution, emitter_position, emitter_power):
+
+def setup_environment(space_dim, resolution, emitter_position, emitter_power, cache=default_cache):
     #print("Setting up environment")
-    environment = rfSim.setup_3d_space(space_dim, resolution)
     emitters = [{"position": emitter_position, "power": emitter_power}]
-    field = rfSim.compute_rf_field_strength(emitters, environment[0], environment[1], environment[2])
-    return environment, field
+    if cache is None:
+        environment = rfSim.setup_3d_space(space_dim, resolution, sparse=True)
+        field = rfSim.compute_rf_field_strength(emitters, environment[0], environment[1], environment[2])
+        return environment, field
+    # Environment and field are shared with other callers of the cache, don't modify them
+    return cache.get(space_dim, resolution, emitters)
 
 def create_antennas(antenna_pairs, phi, antena_std_dev):
     #print("Creating antennas")
@@ -21,14 +26,18 @@ def create_antennas(antenna_pairs, phi, antena_std_dev):
     #ant.plot_antenna_patterns(antDir, antena_std_dev)
     return antPos, antDir
 
-def calculate_signal_strength(field, space_dim, resolution, antPos, antDir, emitter_position, antena_std_dev):
+def calculate_signal_strength(field, space_dim, resolution, antPos, antDir, emitter_position, antena_std_dev, emitter_power=None):
     #print("Calculating signal strength")
-    antSignal = []
-    for i in range(len(antPos)):
-        signal_strength = ex.get_field_strength_at_position(field, space_dim, resolution, antPos[i])
-        directional_signal = ant.directional_antenna(signal_strength, emitter_position, antPos[i], antDir[i], std_dev=antena_std_dev)
-        antSignal.append(directional_signal)
-        #print(f"Antenna {i} signal strength:", directional_signal)
+    if field is None:
+        # Evaluate the field analytically at the antenna positions, no grid needed
+        emitters = [{"position": emitter_position, "power": emitter_power}]
+        field_at_antennas = rfSim.compute_rf_field_strength_at_points(emitters, antPos)
+    else:
+        field_at_antennas = ex.sample_field(field, space_dim, resolution, antPos)
+    field_at_antennas = np.asarray(field_at_antennas, dtype=float)
+    received = ant.directional_antenna_matrix(field_at_antennas[:, None], emitter_position, antPos, antDir, std_dev=antena_std_dev)[:, 0]
+    antSignal = list(zip(field_at_antennas, received))
+    #print("Antenna signal strengths:", antSignal)
     return antSignal
 
 def calculate_target_vector(antSignal, antenna_pairs, antDir):
@@ -41,14 +50,65 @@ def calculate_target_vector(antSignal, antenna_pairs, antDir):
     #print("Target data:", targetData)
     return targetData
 
-def track(space_dim, resolution, emitter_position, emitter_power, antenna_pairs, phi, antena_std_dev):
-    environment, field = setup_environment(space_dim, resolution, emitter_position, emitter_power)
+def track(space_dim, resolution, emitter_position, emitter_power, antenna_pairs, phi, antena_std_dev, cache=default_cache, use_grid=False):
+    # The dense grid is only built when requested (e.g. to match a visualised field)
+    field = None
+    if use_grid:
+        environment, field = setup_environment(space_dim, resolution, emitter_position, emitter_power, cache=cache)
     antPos, antDir = create_antennas(antenna_pairs, phi, antena_std_dev)
-    antSignal = calculate_signal_strength(field, space_dim, resolution, antPos, antDir, emitter_position, antena_std_dev)
+    antSignal = calculate_signal_strength(field, space_dim, resolution, antPos, antDir, emitter_position, antena_std_dev, emitter_power=emitter_power)
     targetData = calculate_target_vector(antSignal, antenna_pairs, antDir)
     return targetData
 
 
+def track_many(emitter_position, emitter_power, base_positions, directions, distance, phi, antena_std_dev):
+    """
+    Vectorized version of track for N antenna pairs in one pass.
+
+    Parameters:
+    emitter_position (array-like): The (x, y, z) coordinates of the emitter.
+    emitter_power (float): The power of the emitter.
+    base_positions (array-like): (N, 3) base positions of the antenna pairs.
+    directions (array-like): (N, 3) direction vectors the antenna pairs are facing.
+    distance (float or array-like): Distance between the two antennas of each pair.
+    phi (float): The angle between the antennas of a pair in radians.
+    antena_std_dev (float): The standard deviation of the Gaussian pattern.
+
+    Returns:
+    origins (ndarray): (N, 3) origin of each target vector.
+    angles (ndarray): (N,) target angle of each pair.
+    target_directions (ndarray): (N, 2) unit target direction of each pair.
+    """
+    base_positions = np.asarray(base_positions, dtype=float).reshape(-1, 3)
+    directions = np.asarray(directions, dtype=float).reshape(-1, 3)
+    distance = np.asarray(distance, dtype=float).reshape(-1, 1)
+    emitter_position = np.asarray(emitter_position, dtype=float)
+
+    # Antenna pair geometry, same construction as testing.create_antenna_pair
+    directions = directions / np.linalg.norm(directions, axis=1, keepdims=True)
+    perpendicular = np.cross(directions, [0, 0, 1])
+    vertical = np.linalg.norm(perpendicular, axis=1) == 0
+    perpendicular[vertical] = np.cross(directions[vertical], [0, 1, 0])
+    perpendicular = perpendicular / np.linalg.norm(perpendicular, axis=1, keepdims=True)
+
+    ant_pos = np.stack([base_positions + (distance / 2) * perpendicular,
+                        base_positions - (distance / 2) * perpendicular])
+
+    c, s = np.cos(phi / 2), np.sin(phi / 2)
+    rotation_matrix = np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
+    ant_dir = np.stack([directions @ rotation_matrix.T, directions @ rotation_matrix])
+
+    # Field at each antenna and Gaussian pickup towards the emitter, shape (2, N)
+    ant_pos = ant_pos.reshape(-1, 3)
+    field_at_antennas = emitter_power / (np.linalg.norm(emitter_position - ant_pos, axis=-1) + 1e-6)
+    received = ant.directional_antenna_matrix(field_at_antennas[:, None], emitter_position, ant_pos, ant_dir.reshape(-1, 3), antena_std_dev)
+    received = received.reshape(2, -1)
+
+    angles = ex.calculate_target_angle(received[0], received[1])
+    target_directions = np.stack([np.cos(angles), np.sin(angles)], axis=1)
+    return base_positions, angles, target_directions
+
+
 """
 # Example usage
 space_dim = 500
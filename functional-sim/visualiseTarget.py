@@ -9,12 +9,10 @@ import antenna as ant
 
 import extras as ex
 
-from targetVector import track
+from targetVector import track, track_many
 import random
 
 
-import localize_RANSAC as ransac_loc
-
 
 # Fixed Location
 emitter_position = np.array([360, 290, 250])
@@ -71,6 +69,35 @@ def get_target_data(space_dim, resolution, emitter_position, emitter_power, ante
     return target_data_list
 
 
+def generate_antenna_pair_arrays(num_pairs=4, pos_limits=(0, 500), dir_limits=(-1, 1), dis=0.1, rng=None):
+    """
+    Array version of generate_antenna_pairs, for use with targetVector.track_many.
+
+    Returns:
+    base_positions (ndarray): (num_pairs, 3) base positions at z = 250.
+    directions (ndarray): (num_pairs, 3) directions in the xy-plane.
+    distances (ndarray): (num_pairs,) distance between the antennas of each pair.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    base_positions = np.full((num_pairs, 3), 250.0)
+    base_positions[:, :2] = rng.uniform(*pos_limits, size=(num_pairs, 2))
+    directions = np.zeros((num_pairs, 3))
+    directions[:, :2] = rng.uniform(*dir_limits, size=(num_pairs, 2))
+    distances = np.full(num_pairs, dis)
+    return base_positions, directions, distances
+
+def get_target_arrays(emitter_position, emitter_power, antenna_pairs, phi, antena_std_dev):
+    """
+    Same as get_target_data but returns (origins, angles, directions) arrays from one vectorized pass.
+    antenna_pairs is either a list of pair dicts or a (base_positions, directions, distances) tuple.
+    """
+    if isinstance(antenna_pairs, list):
+        antenna_pairs = (np.array([pair["pos"] for pair in antenna_pairs], dtype=float),
+                         np.array([pair["dir"] for pair in antenna_pairs], dtype=float),
+                         np.array([pair["dis"] for pair in antenna_pairs], dtype=float))
+    base_positions, directions, distances = antenna_pairs
+    return track_many(emitter_position, emitter_power, base_positions, directions, distances, phi, antena_std_dev)
+
 
 # Step 5: Intercept target vectors to estimate source location
 
@@ -0,0 +1,161 @@
+import numpy as np
+
+import sweep_ingest as si
+
+
+def _lookup(axis, values):
+    """
+    Positions of values in a sorted axis, and whether each value is present there.
+    """
+    pos = np.searchsorted(axis, values)
+    if not len(axis):
+        return pos, np.zeros(len(values), dtype=bool)
+    found = (pos < len(axis)) & (axis[np.minimum(pos, len(axis) - 1)] == values)
+    return pos, found
+
+
+class WaterfallBuilder:
+    def __init__(self, n_bins=11, segments=None, capacity=1024):
+        """
+        Stitches interleaved sweep segments into a dense (time x frequency) power matrix.
+
+        Rows are timestamps, columns are bin centre frequencies ordered by segment.
+        Cells of segments that have not arrived (yet) are NaN. Rows can be appended
+        incrementally as new blocks come in; segments that arrive late for an
+        earlier timestamp are written into that timestamp's row.
+
+        Parameters:
+        -----------
+        n_bins : int
+            Number of bins per segment (b1..bN)
+        segments : array-like, optional
+            Known (hz_start, hz_stop) frequency plan. Segments are otherwise
+            learned from the data, adding columns when a new one shows up.
+        capacity : int
+            Initial number of preallocated rows, doubled when full
+        """
+        self.n_bins = n_bins
+        self._segments = np.empty((0, 2), dtype=np.int64)
+        self._times = np.empty(capacity, dtype="datetime64[us]")
+        self._power = np.full((capacity, 0), np.nan, dtype=np.float32)
+        self._n_rows = 0
+        if segments is not None:
+            self._add_segments(np.asarray(segments, dtype=np.int64).reshape(-1, 2))
+
+    @property
+    def timestamps(self):
+        """Time axis, one entry per row (view)"""
+        return self._times[:self._n_rows]
+
+    @property
+    def frequencies(self):
+        """Bin centre frequencies in Hz, one entry per column"""
+        return si.segment_frequencies(self._segments[:, 0], self._segments[:, 1], self.n_bins).ravel()
+
+    @property
+    def power(self):
+        """(time x frequency) power matrix in dBm (view, NaN for missing segments)"""
+        return self._power[:self._n_rows]
+
+    def __len__(self):
+        return self._n_rows
+
+    def _add_segments(self, segments):
+        merged = np.unique(np.concatenate([self._segments, segments]), axis=0)
+        if len(merged) == len(self._segments):
+            return
+        # Move the existing columns to their place in the new frequency layout
+        old_cols = (np.searchsorted(merged[:, 0], self._segments[:, 0])[:, None] * self.n_bins
+                    + np.arange(self.n_bins)).ravel()
+        power = np.full((self._power.shape[0], len(merged) * self.n_bins), np.nan, dtype=np.float32)
+        power[:, old_cols] = self._power
+        self._segments = merged
+        self._power = power
+
+    def _reserve(self, n_rows):
+        capacity = self._power.shape[0]
+        if n_rows <= capacity:
+            return
+        while capacity < n_rows:
+            capacity *= 2
+        power = np.full((capacity, self._power.shape[1]), np.nan, dtype=np.float32)
+        power[:self._n_rows] = self.power
+        times = np.empty(capacity, dtype="datetime64[us]")
+        times[:self._n_rows] = self.timestamps
+        self._power, self._times = power, times
+
+    def _row_indices(self, timestamps):
+        new_times = np.unique(timestamps)
+        existing = self.timestamps
+        _, known = _lookup(existing, new_times)
+        new_times = new_times[~known]
+
+        if len(new_times):
+            if not len(existing) or new_times[0] > existing[-1]:
+                # Usual case: sweeps arrive in time order, append at the end
+                self._reserve(self._n_rows + len(new_times))
+                self._times[self._n_rows:self._n_rows + len(new_times)] = new_times
+                self._n_rows += len(new_times)
+            else:
+                # Out-of-order timestamp: merge the time axes and move rows down
+                merged = np.union1d(existing, new_times)
+                self._reserve(len(merged))
+                old_rows = np.searchsorted(merged, existing)
+                power = np.full_like(self._power, np.nan)
+                power[old_rows] = self.power
+                self._power = power
+                self._times[:len(merged)] = merged
+                self._n_rows = len(merged)
+
+        return np.searchsorted(self.timestamps, timestamps)
+
+    def append(self, block):
+        """
+        Adds a block of sweep rows, as yielded by sweep_ingest.iter_sweep_blocks.
+
+        Parameters:
+        -----------
+        block : dict
+            Column block with "timestamp", "hz_start", "hz_stop" and "bins"
+
+        Returns:
+        --------
+        WaterfallBuilder
+            self, so calls can be chained
+        """
+        if not len(block["timestamp"]):
+            return self
+        segments = np.stack([block["hz_start"], block["hz_stop"]], axis=1)
+        pos, known = _lookup(self._segments[:, 0], segments[:, 0])
+        if not known.all():
+            self._add_segments(segments[~known])
+            pos = np.searchsorted(self._segments[:, 0], segments[:, 0])
+
+        rows = self._row_indices(block["timestamp"])
+        cols = pos[:, None] * self.n_bins + np.arange(self.n_bins)
+        # Repeated segments within one timestamp: the later row wins
+        self._power[rows[:, None], cols] = block["bins"]
+        return self
+
+    def filled(self):
+        """
+        Copy of the power matrix with missing cells carried forward from the previous row
+        of the same column (cells before a column's first value stay NaN).
+        """
+        power = self.power
+        valid = ~np.isnan(power)
+        idx = np.where(valid, np.arange(len(power))[:, None], 0)
+        np.maximum.accumulate(idx, axis=0, out=idx)
+        return power[idx, np.arange(power.shape[1])]
+
+
+def build_waterfall(path, delimiter=";", chunk_rows=65536):
+    """
+    Streams a sweep capture into a WaterfallBuilder.
+    """
+    builder = None
+    for block in si.iter_sweep_blocks(path, chunk_rows=chunk_rows, delimiter=delimiter):
+        if builder is None:
+            builder = WaterfallBuilder(n_bins=block["bins"].shape[1])
+        builder.append(block)
+    return builder
@@ -22,6 +22,10 @@ class SwitchedArrayRDF:
             for angle in self.antenna_angles
         ])
 
+        # Filled in by build_steering_table
+        self.table_angles = None
+        self.steering_table = None
+
     def simulate_received_power(self, signal_angle, signal_strength=1.0, noise_level=0.1):
         """
         Simulate received power at each antenna
@@ -70,7 +74,7 @@ class SwitchedArrayRDF:
             Confidence metric (0-1)
         """
 
-        print("Estimating direction for", powers)
+        # print("Estimating direction for", powers)
         # Find antenna with maximum power
         max_idx = np.argmax(powers)
 
@@ -132,6 +136,189 @@ class SwitchedArrayRDF:
 
         return est_angle, error_deg, confidence
 
+    def expected_power(self, signal_angles, signal_strength=1.0):
+        """
+        Noise-free received power at each antenna, same model as simulate_received_power
+
+        Parameters:
+        -----------
+        signal_angles : numpy.ndarray
+            Angles of arrival in radians
+        signal_strength : float
+            Incident signal strength
+
+        Returns:
+        --------
+        numpy.ndarray
+            Powers with shape signal_angles.shape + (n_antennas,)
+        """
+        signal_angles = np.asarray(signal_angles, dtype=float)[..., None]
+        distances = np.sqrt(
+            (self.positions[:, 0] - self.radius * np.cos(signal_angles))**2 +
+            (self.positions[:, 1] - self.radius * np.sin(signal_angles))**2
+        ) + 1e-6
+        return signal_strength / (distances**2)
+
+    def simulate_received_power_batch(self, signal_angles, noise_levels, rng, signal_strength=1.0):
+        """
+        Vectorized simulate_received_power for any shape of angles and noise levels
+
+        Parameters:
+        -----------
+        signal_angles : numpy.ndarray
+            Angles of arrival in radians
+        noise_levels : numpy.ndarray
+            Noise standard deviations, broadcastable against signal_angles
+        rng : numpy.random.Generator
+            Source of the noise
+        signal_strength : float
+            Incident signal strength
+
+        Returns:
+        --------
+        numpy.ndarray
+            Received powers with shape broadcast(signal_angles, noise_levels) + (n_antennas,)
+        """
+        powers = self.expected_power(signal_angles, signal_strength)
+        noise = rng.standard_normal(np.broadcast_shapes(powers.shape, np.shape(noise_levels) + (1,)))
+        return powers + noise * np.asarray(noise_levels, dtype=float)[..., None]
+
+    def estimate_direction_batch(self, powers):
+        """
+        Vectorized estimate_direction over the last axis of powers
+
+        Parameters:
+        -----------
+        powers : numpy.ndarray
+            (..., n_antennas) received powers
+
+        Returns:
+        --------
+        numpy.ndarray
+            Estimated angles of arrival in radians
+        numpy.ndarray
+            Confidence metrics (0-1)
+        """
+        powers = np.asarray(powers, dtype=float)
+        max_idx = np.argmax(powers, axis=-1)[..., None]
+        next_idx = (max_idx + 1) % self.n_antennas
+        prev_idx = (max_idx - 1) % self.n_antennas
+
+        max_power = np.take_along_axis(powers, max_idx, axis=-1)[..., 0]
+        next_power = np.take_along_axis(powers, next_idx, axis=-1)[..., 0]
+        prev_power = np.take_along_axis(powers, prev_idx, axis=-1)[..., 0]
+
+        # Same interpolation as estimate_direction, towards the stronger neighbour
+        delta_angle = 2*np.pi / self.n_antennas
+        use_next = next_power > prev_power
+        ratio = np.where(use_next, next_power, prev_power) / max_power
+        offset = ratio * delta_angle / 2
+        angle = self.antenna_angles[max_idx[..., 0]] + np.where(use_next, offset, -offset)
+
+        confidence = max_power / (np.sum(powers, axis=-1) + 1e-6)
+        return angle, confidence
+
+    def build_steering_table(self, n_angles=3600):
+        """
+        Precompute the expected power pattern of the array for a fine grid of angles
+
+        Each row is normalised to unit length, so matching a measurement against the
+        whole table is a single matrix product.
+
+        Parameters:
+        -----------
+        n_angles : int
+            Number of table angles over [0, 2*pi)
+        """
+        self.table_angles = np.linspace(0, 2*np.pi, n_angles, endpoint=False)
+        table = self.expected_power(self.table_angles)
+        self.steering_table = table / np.linalg.norm(table, axis=1, keepdims=True)
+
+    def estimate_direction_table(self, powers):
+        """
+        Estimate direction by correlating powers against the steering table
+
+        The table angle whose pattern best matches the measurement (least squares
+        with a free gain, i.e. maximum normalised correlation) is returned.
+        build_steering_table is called with its defaults if no table exists yet.
+
+        Parameters:
+        -----------
+        powers : numpy.ndarray
+            (..., n_antennas) received powers
+
+        Returns:
+        --------
+        numpy.ndarray
+            Estimated angles of arrival in radians
+        numpy.ndarray
+            Confidence metric (0-1), the correlation with the best pattern
+        """
+        if self.steering_table is None:
+            self.build_steering_table()
+        powers = np.asarray(powers, dtype=float)
+        flat = powers.reshape(-1, self.n_antennas)
+
+        # (measurements, table angles) correlation as one GEMM per block of measurements
+        best = np.empty(len(flat), dtype=int)
+        best_score = np.empty(len(flat))
+        block = max(1, 2**24 // len(self.table_angles))
+        for start in range(0, len(flat), block):
+            scores = flat[start:start + block] @ self.steering_table.T
+            best[start:start + block] = np.argmax(scores, axis=1)
+            best_score[start:start + block] = scores[np.arange(len(scores)), best[start:start + block]]
+        norms = np.linalg.norm(flat, axis=1) + 1e-12
+        confidence = np.clip(best_score / norms, 0, 1)
+
+        shape = powers.shape[:-1]
+        return self.table_angles[best].reshape(shape), confidence.reshape(shape)
+
+    def monte_carlo(self, signal_angles, snr_db, n_trials, seed=None, signal_strength=1.0, estimator="interpolate"):
+        """
+        Batch version of process_measurement over true angles x SNRs x trials
+
+        Parameters:
+        -----------
+        signal_angles : array-like
+            True angles of arrival in radians
+        snr_db : array-like
+            Signal-to-noise ratios in dB
+        n_trials : int
+            Number of noisy trials per (angle, SNR)
+        seed : int or numpy.random.Generator, optional
+            Seed for numpy.random.default_rng, for reproducible runs
+        signal_strength : float
+            Incident signal strength
+        estimator : str
+            "interpolate" for estimate_direction_batch, "table" for estimate_direction_table
+
+        Returns:
+        --------
+        dict
+            "powers" (angles, snrs, trials, n_antennas), and "estimates", "errors"
+            (degrees) and "confidences" with shape (angles, snrs, trials)
+        """
+        if estimator not in ("interpolate", "table"):
+            raise ValueError(f"Unknown estimator {estimator!r}, expected 'interpolate' or 'table'")
+        rng = np.random.default_rng(seed)
+        signal_angles = np.atleast_1d(np.asarray(signal_angles, dtype=float))[:, None, None]
+        snr = 10**(np.atleast_1d(np.asarray(snr_db, dtype=float)) / 10)
+        noise_levels = np.broadcast_to((1/snr)[None, :, None], (1, len(snr), n_trials))
+
+        powers = self.simulate_received_power_batch(signal_angles, noise_levels, rng, signal_strength)
+        if estimator == "table":
+            estimates, confidences = self.estimate_direction_table(powers)
+        else:
+            estimates, confidences = self.estimate_direction_batch(powers)
+        errors = np.abs(np.degrees(np.angle(np.exp(1j * (estimates - signal_angles)))))
+
+        return {
+            "powers": powers,
+            "estimates": estimates,
+            "errors": errors,
+            "confidences": confidences,
+        }
+
 # Example usage
 def demo_rdf():
     # Create RDF system with 8 antennas